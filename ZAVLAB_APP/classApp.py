@@ -1148,7 +1148,7 @@ class ZAVLAB(QMainWindow):
             "table": {
                 "decimal_places": self.model.decimal_places,
                 "column_names": self.model._column_names,
-                "formulas": self.model._formulas,
+                "formulas": self.model.get_formulas(),
                 "row_count": self.model.rowCount(),
                 "column_count": self.model.columnCount()
             },
@@ -1,18 +1,77 @@
+import copy
 import json
 import logging
-from PyQt6.QtCore import QTimer, QObject
+import uuid
+from PyQt6.QtCore import QTimer, QObject, QRunnable, QThreadPool, pyqtSignal
 from PyQt6.QtWidgets import QApplication
 import os
+from project_format import ProjectData, read_project, write_project
+
+
+def _write_json(filename: str, data) -> None:
+    """Write a JSON file atomically: to a temporary file first, then moved into place."""
+
+    temp_name = f"{filename}.tmp"
+    with open(temp_name, 'w') as f:
+        json.dump(data, f, indent=4)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_name, filename)
+
+
+def _sync(fd: int) -> None:
+    """Flush a duplicated file descriptor to disk and close it."""
+
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class SaveSignals(QObject):
+    """Signals of a save task."""
+
+    finished = pyqtSignal(object)  # Return value of the save function
+    failed = pyqtSignal(str)  # Error message
+
+
+class SaveTask(QRunnable):
+    """Runs one save function on a worker thread."""
+
+    def __init__(self, function, *args):
+        super().__init__()
+        self.function = function
+        self.args = args
+        self.signals = SaveSignals()
+
+    def run(self) -> None:
+        try:
+            result = self.function(*self.args)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit(result)
 
 
 class AutoSaveManager(QObject):
     """
     Manager for automatic saving of application state.
     Creates backups in case of emergency situations.
+
+    After start_journal() the state is saved incrementally: every edit of the table
+    and every change of the plot settings is appended to a journal as it happens,
+    and the journal is compacted into a binary snapshot from time to time.
+    Recovery loads the snapshot and replays the journal.
+
+    Only a copy of the state is taken on the GUI thread; serialization and file
+    writes run on a worker thread, and every file is replaced atomically.
     """
 
     ###Constants
     TIMER_INTERVAL = 60000 # in ms = 1 minute
+    COMPACT_RECORDS = 10000 # journal records after which a new snapshot is written
+    SNAPSHOT_FILE = "./files/autosave_snapshot.zlab"
+    JOURNAL_FILE = "./files/autosave_journal.jsonl"
     ###
 
     
@@ -21,6 +80,15 @@ class AutoSaveManager(QObject):
         
         super().__init__(parent)
         self.save_interval = save_interval
+        self._journal = None  # Open journal file while journaling
+        self._journal_records = 0  # Records in the journal file
+        self._session = None  # Id written to the journal and its snapshots
+        self._seq = 0  # Number of the last journal record
+        self._tail = None  # Records appended while a snapshot is being written
+        self._compact_again = False  # The state was reset while a snapshot was being written
+        self._last_plots = None  # Plot settings as last written to the journal or snapshot
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)  # Files are written in the order the saves were started
         self.timer = QTimer()
         self.timer.timeout.connect(self.auto_save)
         self.timer.start(self.save_interval)
@@ -42,31 +110,212 @@ class AutoSaveManager(QObject):
             format='%(asctime)s - %(levelname)s - %(message)s'
         )
     
+    def _start_task(self, function, *args, finished=None) -> None:
+        """Run a save function on the worker thread, errors are logged."""
+
+        task = SaveTask(function, *args)
+        if finished is not None:
+            task.signals.finished.connect(finished)
+        task.signals.failed.connect(lambda error: logging.error(f"Auto-save error: {error}"))
+        self._pool.start(task)
+
     def auto_save(self):
         """Creates backup files with current data and app settings."""
 
+        if self._journal is not None:
+            self._save_journal()
+            return
         try:
-            sub_state = self.parent().plotter.get_state()  
+            # get_state builds new containers, the plot settings are copied
+            sub_state = copy.deepcopy(self.parent().plotter.get_state())
             state = self.parent().get_state()
-            self.save_to_file(sub_state, state)
-            logging.info("Auto-save completed successfully")
+            self._start_task(self.save_to_file, sub_state, state,
+                             finished=lambda _: logging.info("Auto-save completed successfully"))
         except Exception as e:
             logging.error(f"Auto-save error: {str(e)}")
     
+    def start_journal(self):
+        """
+        Save the parent window incrementally from now on.
+        The parent must provide model, plotter and project_contents().
+        """
+
+        self._session = uuid.uuid4().hex
+        self._seq = 0
+        self.parent().model.edited.connect(self.record)
+        self.parent().plotter.settings_changed.connect(self.record_plots)
+        self.compact()
+
+    def record(self, entry: dict):
+        """Append one journal record (an edit emitted by the table model)."""
+
+        if entry.get("op") == "reset":
+            # A loaded table can't be described by edits, so it starts a new snapshot
+            self.compact()
+            return
+        if self._journal is None and self._tail is None:
+            return
+        try:
+            self._seq += 1
+            line = json.dumps({**entry, "seq": self._seq}) + "\n"
+            # Until the first snapshot of the session is written there's only the tail
+            if self._journal is not None:
+                self._journal.write(line)
+                self._journal.flush()
+                self._journal_records += 1
+            if self._tail is not None:
+                self._tail.append(line)
+        except Exception as e:
+            logging.error(f"Journal writing error: {str(e)}")
+
+    def record_plots(self):
+        """Append a journal record with the plot settings if they changed since the last one."""
+
+        try:
+            plots = self.parent().convert_numpy_types(self.parent().plotter.get_state())
+        except Exception as e:
+            logging.error(f"Journal writing error: {str(e)}")
+            return
+        if plots != self._last_plots:
+            self.record({"op": "plots", "state": plots})
+            self._last_plots = plots
+
+    def _save_journal(self):
+        """Make the journal durable; compact it when it gets long."""
+
+        try:
+            # Plot changes made without a signal of the plotter are caught here
+            self.record_plots()
+            if self._journal_records >= self.COMPACT_RECORDS:
+                self.compact()
+            else:
+                self._start_task(_sync, os.dup(self._journal.fileno()))
+        except Exception as e:
+            logging.error(f"Auto-save error: {str(e)}")
+
+    def compact(self, wait: bool = False):
+        """
+        Write a snapshot of the whole state and drop the journal records it covers.
+
+        Args:
+            wait: Write the snapshot on the calling thread (when the application closes)
+        """
+
+        if self._tail is not None:
+            # A snapshot is being written; take another one when it is done
+            self._compact_again = True
+            return
+        try:
+            table, columns, plots, extra = self.parent().project_contents()
+            # The arrays are views of the live table
+            columns = [(values.copy(), mask.copy(), texts) for values, mask, texts in columns]
+            # The snapshot covers the journal up to the current record, so after a
+            # crash at any point of the save only the newer records are replayed
+            extra["journal"] = self._session
+            extra["journal_seq"] = self._seq
+            self._last_plots = plots
+            self._tail = []
+            if wait:
+                write_project(self.SNAPSHOT_FILE, table, columns, plots, extra)
+                self._snapshot_written(self._seq)
+            else:
+                task = SaveTask(write_project, self.SNAPSHOT_FILE, table, columns, plots, extra)
+                seq = self._seq
+                task.signals.finished.connect(lambda _: self._snapshot_written(seq))
+                task.signals.failed.connect(self._snapshot_failed)
+                self._pool.start(task)
+        except Exception as e:
+            self._tail = None
+            logging.error(f"Auto-save snapshot error: {str(e)}")
+
+    def _snapshot_written(self, seq: int):
+        """Start the journal over with the records appended after the snapshot."""
+
+        tail, self._tail = self._tail or [], None
+        try:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            temp_name = f"{self.JOURNAL_FILE}.tmp"
+            with open(temp_name, 'w', encoding='utf-8') as f:
+                f.write(json.dumps({"op": "start", "session": self._session, "base": seq}) + "\n")
+                f.writelines(tail)
+            os.replace(temp_name, self.JOURNAL_FILE)
+            self._journal = open(self.JOURNAL_FILE, 'a', encoding='utf-8')
+            self._journal_records = len(tail)
+            logging.info("Auto-save snapshot written")
+        except Exception as e:
+            logging.error(f"Journal writing error: {str(e)}")
+        if self._compact_again:
+            self._compact_again = False
+            self.compact()
+
+    def _snapshot_failed(self, error: str):
+        """Keep journaling into the current journal, which still extends the last snapshot."""
+
+        self._tail = None
+        logging.error(f"Auto-save snapshot error: {error}")
+
+    def close(self):
+        """Compact the journal and stop saving (when the application closes)."""
+
+        self.timer.stop()
+        self._pool.waitForDone()
+        # Deliver the results of the last save before the final snapshot
+        QApplication.processEvents()
+        if self._journal is not None:
+            self._compact_again = False
+            self.compact(wait=True)
+            self._journal.close()
+            self._journal = None
+
+    def load_journal(self) -> tuple[ProjectData | None, list[dict]]:
+        """
+        Return the snapshot and the journal records saved after it.
+        A journal cut off by a crash is read up to its last complete record.
+
+        Returns:
+            (snapshot, records), or (None, []) if there is nothing to restore
+        """
+
+        try:
+            project = read_project(self.SNAPSHOT_FILE)
+        except FileNotFoundError:
+            logging.warning("The auto-save file was not found")
+            return (None, [])
+        except Exception as e:
+            logging.error(f"File reading error: {str(e)}")
+            return (None, [])
+
+        records = []
+        try:
+            with open(self.JOURNAL_FILE, 'r', encoding='utf-8') as f:
+                start = json.loads(f.readline())
+                covered = project.extra.get("journal_seq", 0)
+                # The journal must continue the snapshot without a gap
+                if start.get("session") == project.extra.get("journal") and start.get("base", 0) <= covered:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except json.JSONDecodeError:
+                            break
+                        if record.get("seq", 0) > covered:
+                            records.append(record)
+        except (OSError, json.JSONDecodeError) as e:
+            logging.warning(f"The auto-save journal can't be read: {str(e)}")
+        return (project, records)
+
     def save_to_file(self, sub_state: dict, state: dict, filename_subs="./files/autosave_backup_subplots.json", filename="./files/autosave_backup_table.json"):
         """Saves current state."""
         
         try:
-            with open(filename_subs, 'w') as f:
-                json.dump(sub_state, f, indent=4)
+            # Each file is replaced atomically, so a crash can't corrupt a file and its backup copy at once
+            _write_json(filename_subs, sub_state)
             # Creating a backup copy
-            with open(f"{filename_subs}.backup", 'w') as f:
-                json.dump(sub_state, f, indent=4)
-            with open(filename, 'w') as f:
-                json.dump(state, f, indent=4)
+            _write_json(f"{filename_subs}.backup", sub_state)
+            _write_json(filename, state)
             # Creating a backup copy
-            with open(f"{filename}.backup", 'w') as f:
-                json.dump(state, f, indent=4)
+            _write_json(f"{filename}.backup", state)
         except Exception as e:
             logging.error(f"File recording error: {str(e)}")
 
@@ -0,0 +1,152 @@
+"""
+Streaming CSV import for the Excel-like table:
+- Parses the file in chunks with the pandas C parser on a QThreadPool worker
+- Converts every chunk straight into columnar data (float64 values, validity
+  mask and sparse text), numeric columns are recognised per chunk without
+  converting cells one by one
+- Reports progress and can be cancelled between chunks
+"""
+
+import csv
+import io
+import os
+import numpy as np
+import pandas as pd
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+
+CHUNK_ROWS: int = 200_000  # Rows parsed at once
+DELIMITER: str = ';'  # Same delimiter as the CSV export
+
+
+class CsvTable:
+    """Parsed CSV contents in the layout taken by ExcelLikeModel.load_columns."""
+
+    def __init__(self, headers: list[str], row_count: int, columns: list[tuple[np.ndarray, np.ndarray, dict]]):
+        """
+        Args:
+            headers: Column names from the first line
+            row_count: Number of data rows
+            columns: (values, mask, {row: text}) per column
+        """
+
+        self.headers = headers
+        self.row_count = row_count
+        self.columns = columns
+
+
+def convert_chunk(series: pd.Series, offset: int) -> tuple[np.ndarray, np.ndarray, dict]:
+    """
+    Convert one column chunk into (values, mask, {row: text}).
+    As in ColumnarStore.set, a number that isn't written the way format_number
+    writes it (e.g. '1.50' or '007') keeps its raw text next to its value.
+
+    Args:
+        series: Raw cell texts of the chunk (blank cells are NaN); cells read from a
+                spreadsheet may also be numbers, they have no text to keep
+        offset: Table row of the first cell of the chunk
+    """
+
+    # Numbers are found in one vectorized call
+    values = pd.to_numeric(series, errors='coerce').to_numpy(dtype=float, na_value=np.nan, copy=True)
+    mask = ~np.isnan(values)
+    raw = series.to_numpy(dtype=object)
+    rows = np.flatnonzero(series.notna().to_numpy() & ~mask)
+    texts = dict(zip((rows + offset).tolist(), (str(text) for text in raw[rows])))
+
+    numbers = np.flatnonzero(mask)
+    if pd.api.types.infer_dtype(series, skipna=True) != 'string':
+        numbers = numbers[[isinstance(raw[row], str) for row in numbers]]
+    if numbers.size:
+        typed = np.char.strip(raw[numbers].astype(str))
+        # to_numeric may be off by the last digit, numpy converts the text exactly like float()
+        values[numbers] = typed.astype(float)
+        # numpy writes a float64 as repr does; format_number also drops a trailing '.0'
+        canonical = values[numbers].astype(str)
+        same = np.where(np.char.endswith(canonical, '.0'),
+                        np.char.add(typed, '.0') == canonical, typed == canonical)
+        rows = numbers[~same]
+        texts.update(zip((rows + offset).tolist(), raw[rows].tolist()))
+    return values, mask, texts
+
+
+def read_csv_chunks(file_name: str, progress=None, cancelled=None) -> CsvTable | None:
+    """
+    Read a CSV file exported by the table (';'-separated, headers in the first line).
+
+    Args:
+        file_name: Path of the file
+        progress: Optional callable taking the percentage of the file read so far
+        cancelled: Optional callable returning True when the import must stop
+
+    Returns:
+        Parsed table, or None if the import was cancelled
+    """
+
+    size = max(os.path.getsize(file_name), 1)
+    with open(file_name, 'rb') as csvfile:
+        header_line = csvfile.readline().decode('utf-8')
+        headers = next(csv.reader(io.StringIO(header_line), delimiter=DELIMITER), [])
+        if not headers:
+            raise ValueError("The file has no header line")
+        columns = list(range(len(headers)))
+
+        chunks = [[] for _ in headers]
+        row_count = 0
+        # Blank lines are kept as empty rows and extra cells beyond the headers are ignored;
+        # cells are read as text, so convert_chunk sees what was written in the file
+        reader = pd.read_csv(csvfile, sep=DELIMITER, header=None, names=columns, usecols=columns,
+                             index_col=False, dtype=str, keep_default_na=False, na_values=[''],
+                             skip_blank_lines=False, chunksize=CHUNK_ROWS, encoding='utf-8')
+        with reader:
+            for frame in reader:
+                if cancelled is not None and cancelled():
+                    return None
+                for col in columns:
+                    chunks[col].append(convert_chunk(frame[col], row_count))
+                row_count += len(frame)
+                if progress is not None:
+                    progress(min(100, int(100 * csvfile.tell() / size)))
+
+    table_columns = []
+    for parts in chunks:
+        if not parts:
+            table_columns.append((np.empty(0), np.zeros(0, dtype=bool), {}))
+            continue
+        texts = {}
+        for _, _, part_texts in parts:
+            texts.update(part_texts)
+        table_columns.append((np.concatenate([values for values, _, _ in parts]),
+                              np.concatenate([mask for _, mask, _ in parts]), texts))
+    return CsvTable(headers, row_count, table_columns)
+
+
+class CsvImportSignals(QObject):
+    """Signals of a CSV import task."""
+
+    progress = pyqtSignal(int)  # Percentage of the file read
+    finished = pyqtSignal(object)  # CsvTable, or None if cancelled
+    failed = pyqtSignal(str)  # Error message
+
+
+class CsvImportTask(QRunnable):
+    """Reads a CSV file on a worker thread."""
+
+    def __init__(self, file_name: str):
+        super().__init__()
+        self.file_name = file_name
+        self.signals = CsvImportSignals()
+        self._cancelled = False
+
+    def cancel(self) -> None:
+        """Stop the import before the next chunk."""
+
+        self._cancelled = True
+
+    def run(self) -> None:
+        try:
+            table = read_csv_chunks(self.file_name, self.signals.progress.emit, lambda: self._cancelled)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit(None if self._cancelled else table)
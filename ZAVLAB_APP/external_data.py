@@ -0,0 +1,91 @@
+"""
+External data columns for the Excel-like table:
+- Attaches a .npy file or a raw binary file as a read-only column
+- Values are served from a np.memmap, so only the pages that are shown,
+  referenced by formulas or plotted are read from disk
+"""
+
+import os
+import re
+import numpy as np
+
+
+RAW_DTYPES: list[str] = ['float64', 'float32', 'int64', 'int32', 'int16', 'uint16', 'int8', 'uint8']
+
+
+class ExternalColumn:
+    """Read-only column backed by a memory-mapped file."""
+
+    def __init__(self, path: str, dtype: str | None = None, offset: int = 0):
+        """
+        Args:
+            path: .npy file, or raw binary file of little-endian numbers
+            dtype: Type of the numbers of a raw file (ignored for .npy)
+            offset: Bytes to skip at the start of a raw file
+        """
+
+        self.path = path
+        self.offset = offset
+        if path.lower().endswith('.npy'):
+            data = np.load(path, mmap_mode='r')
+        else:
+            data = np.memmap(path, dtype=np.dtype(dtype or 'float64').newbyteorder('<'), mode='r', offset=offset)
+        if data.ndim != 1:
+            raise ValueError("Only one-dimensional arrays can be attached as a column")
+        if data.dtype.kind not in 'biuf':
+            raise ValueError(f"Unsupported data type: {data.dtype}")
+        self.data = data
+        self.dtype = str(data.dtype)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @property
+    def name(self) -> str:
+        """Column name derived from the file name, usable in formulas."""
+
+        name = re.sub(r'\W', '_', os.path.splitext(os.path.basename(self.path))[0])
+        return name if re.match(r'^[A-Za-z_]', name) else f"_{name}"
+
+    def spec(self) -> dict:
+        """Description used to attach the file again when a saved table is loaded."""
+
+        return {"path": self.path, "dtype": self.dtype, "offset": self.offset}
+
+    def value(self, row: int):
+        """Value of one row as a float, '' past the end of the file."""
+
+        if row < len(self.data):
+            return float(self.data[row])
+        return ''
+
+    def values(self, row_count: int, rows=None) -> np.ndarray:
+        """
+        Return the values as float64, NaN past the end of the file.
+
+        Args:
+            row_count: Number of rows of the table
+            rows: Optional slice or row indices; all rows by default
+
+        Returns:
+            A view of the mapping when the data is float64 and inside the file, otherwise a copy
+        """
+
+        data = self.data[:row_count]
+        if isinstance(rows, slice):
+            start, stop, step = rows.indices(row_count)
+            if step > 0:
+                # Only the rows of the slice are read; rows past the end of the file are padded
+                inside = data[start:min(stop, len(data)):step]
+                if start + len(inside) * step >= stop:
+                    return np.asarray(inside, dtype=float)
+                values = np.full(len(range(start, stop, step)), np.nan)
+                values[:len(inside)] = inside
+                return values
+        if len(data) < row_count:
+            padded = np.full(row_count, np.nan)
+            padded[:len(data)] = data
+            data = padded
+        if rows is not None:
+            data = data[rows]
+        return np.asarray(data, dtype=float)
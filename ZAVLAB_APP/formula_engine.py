@@ -0,0 +1,457 @@
+"""
+Formula compilation for the Excel-like table:
+- Parses a formula once into a validated AST
+- Turns the AST into a tree of closures with pre-resolved cell references
+- Shares compiled objects between cells holding the same formula text
+- Compiles whole-column formulas (e.g. =[A]*[B]^2) into NumPy expressions
+- Resolves ranges (e.g. =sum([A]1:[A]500) or =mean([A])) to arrays reduced with NumPy
+- Splits a formula into a template with relative references for filling it into other cells
+"""
+
+import ast
+import re
+import numpy as np
+
+
+REFERENCE_PLACEHOLDER: str = "__ref{}"  # Name given to the n-th cell reference inside the parsed expression
+COLUMN_PLACEHOLDER: str = "__col{}"  # Name given to the n-th whole-column reference
+RANGE_PLACEHOLDER: str = "__rng{}"  # Name given to the n-th range reference
+MAXIMUM_EXPONENT: int = 1000  # Larger exponents are rejected for safety
+COLUMN_PATTERN: str = r'\[([A-Za-z_][A-Za-z0-9_]*)\](?!\d)'  # Column reference without a row number
+RANGE_PATTERN: str = r'\[([A-Za-z_][A-Za-z0-9_]*)\](\d+):\[([A-Za-z_][A-Za-z0-9_]*)\](\d+)'  # [A]1:[A]500
+
+
+def _vector_log(values, base=None):
+    """Natural logarithm, or logarithm in the given base like math.log."""
+
+    if base is None:
+        return np.log(values)
+    return np.log(values) / np.log(base)
+
+
+def _vector_round(values, digits=0):
+    return np.round(values, int(digits))
+
+
+def _vector_min(*args):
+    """Element-wise minimum of the arguments, or the minimum of a single column."""
+
+    if len(args) == 1:
+        return np.nanmin(args[0])
+    return np.minimum.reduce(np.broadcast_arrays(*args))
+
+
+def _vector_max(*args):
+    """Element-wise maximum of the arguments, or the maximum of a single column."""
+
+    if len(args) == 1:
+        return np.nanmax(args[0])
+    return np.maximum.reduce(np.broadcast_arrays(*args))
+
+
+# NumPy counterparts of the table's whitelisted functions, used by column formulas.
+# Aggregates reduce a column to a scalar, which is then broadcast over the rows.
+VECTOR_FUNCTIONS: dict = {
+    'abs': np.abs,
+    'round': _vector_round,
+    'min': _vector_min,
+    'max': _vector_max,
+    'sum': np.nansum,
+    'sqrt': np.sqrt,
+    'sin': np.sin,
+    'cos': np.cos,
+    'tan': np.tan,
+    'log': _vector_log,
+    'log10': np.log10,
+    'exp': np.exp,
+    'pi': np.pi,
+    'e': np.e,
+    'mean': np.nanmean,
+    'median': np.nanmedian,
+    'stdev': lambda values: np.nanstd(values, ddof=1),
+    'len': lambda values: np.count_nonzero(~np.isnan(values)),
+    'int': np.trunc,
+    'float': lambda values: np.asarray(values, dtype=float),
+}
+
+
+def _range_numbers(args) -> np.ndarray:
+    """Flatten the arguments of an aggregate into one array of its numeric values."""
+
+    values = np.concatenate([np.ravel(np.asarray(arg, dtype=float)) for arg in args])
+    return values[~np.isnan(values)]
+
+
+def _reduction(function, minimum: int = 1):
+    """Aggregate over all values of all arguments, skipping blank and text cells."""
+
+    def reduce(*args):
+        values = _range_numbers(args)
+        if len(values) < minimum:
+            raise ValueError(f"needs at least {minimum} numeric value{'s' if minimum > 1 else ''}")
+        return function(values)
+    return reduce
+
+
+# Aggregates used by cell formulas when an argument is a range.
+# Like in spreadsheets they reduce every value of every argument together.
+RANGE_FUNCTIONS: dict = {
+    'sum': _reduction(np.sum, minimum=0),
+    'mean': _reduction(np.mean),
+    'median': _reduction(np.median),
+    'stdev': _reduction(lambda values: np.std(values, ddof=1), minimum=2),
+    'min': _reduction(np.min),
+    'max': _reduction(np.max),
+    'len': _reduction(len, minimum=0),
+}
+
+
+# Functions that reduce a whole column to one value, so a formula calling them
+# computes something else as a column formula than row by row
+REDUCING_FUNCTIONS: set = {'sum', 'mean', 'median', 'stdev', 'len'}
+
+
+class FormulaTemplate:
+    """
+    Formula split around its cell references, for copying it to other cells.
+    The formula is parsed once; a copy shifted by some rows and columns is built by
+    joining strings.
+    """
+
+    def __init__(self, formula: str, column_resolver, cell_pattern: str):
+        """
+        Args:
+            formula: Formula as written for its original cell
+            column_resolver: Callable converting a column name to its index (-1 if unknown)
+            cell_pattern: Regular expression matching '[Column]row' references
+        """
+
+        self.formula = formula
+        self.references = []  # Zero-based (row, col) and text of every reference
+        self._parts = []  # Text before every reference, then the rest of the formula
+        position = 0
+        if formula.startswith('='):
+            for match in re.finditer(cell_pattern, formula):
+                self._parts.append(formula[position:match.start()])
+                self.references.append((int(match.group(3)) - 1, column_resolver(match.group(2)), match.group(0)))
+                position = match.end()
+        self._parts.append(formula[position:])
+
+    def instantiate(self, row_offset: int, col_offset: int, column_names: list[str], row_count: int) -> str:
+        """
+        Return the formula moved by the given offsets.
+        References that would leave the table, or name unknown columns, are kept as written.
+        """
+
+        if not self.references:
+            return self.formula
+        pieces = [self._parts[0]]
+        for (row, col, text), part in zip(self.references, self._parts[1:]):
+            row += row_offset
+            if col >= 0 and 0 <= col + col_offset < len(column_names) and 0 <= row < row_count:
+                text = f"[{column_names[col + col_offset]}]{row + 1}"
+            pieces += [text, part]
+        return ''.join(pieces)
+
+    def fits(self, row_offset: int, col_offset: int, column_count: int, row_count: int) -> bool:
+        """Check if every reference of the copy moved by the offsets stays inside the table."""
+
+        return all(col >= 0 and 0 <= col + col_offset < column_count and 0 <= row + row_offset < row_count
+                   for row, col, _ in self.references)
+
+    def column_formula(self, row: int, col_offset: int, column_names: list[str]) -> str | None:
+        """
+        Return the whole-column formula equal to filling the template down a column.
+        That is the case if every reference is in the template's own row, e.g.
+        =[A]1*2 written for row 1 becomes =[A]*2.
+
+        Args:
+            row: Zero-based row the template was written for
+            col_offset: Column offset of the filled column from the template's column
+            column_names: Current column names
+
+        Returns:
+            The formula, or None if the copies differ by more than their row
+        """
+
+        if not self.references or re.search(r'\b(' + '|'.join(REDUCING_FUNCTIONS) + r')\s*\(', self.formula):
+            return None
+        pieces = [self._parts[0]]
+        for (ref_row, col, _), part in zip(self.references, self._parts[1:]):
+            if ref_row != row or col < 0 or not 0 <= col + col_offset < len(column_names):
+                return None
+            pieces += [f"[{column_names[col + col_offset]}]", part]
+        return ''.join(pieces)
+
+
+class CompiledFormula:
+    """
+    Formula compiled into a closure tree.
+    References are resolved to (row, col) pairs at compile time, so evaluation only
+    looks up the referenced values.
+    """
+
+    def __init__(self, text: str, references: list[tuple[int, int]], function=None, error: str | None = None,
+                 columns: list[int] | None = None, ranges: list[tuple[int, int, int | None]] | None = None):
+        """
+        Args:
+            text: Original formula text (starting with '=')
+            references: Zero-based (row, col) pairs in order of appearance
+            function: Closure taking a list of reference values and returning the result
+            error: Compilation error message, if the formula is invalid
+            columns: Indices of whole columns referenced by a column formula
+            ranges: Zero-based (col, first row, last row) of referenced ranges;
+                    last row is None for a whole column
+        """
+
+        self.text = text
+        self.references = references
+        self.columns = columns or []
+        self.ranges = ranges or []
+        self._function = function
+        self.error = error
+
+    @property
+    def is_column_formula(self) -> bool:
+        """True if the formula works on whole columns and yields one value per row."""
+
+        return bool(self.columns)
+
+    def evaluate(self, lookup, column_lookup=None, range_lookup=None):
+        """
+        Evaluate the formula.
+
+        Args:
+            lookup: Callable (row, col) -> value used for every referenced cell
+            column_lookup: Callable col -> float64 array used for every referenced column
+            range_lookup: Callable (col, first, last) -> float64 array used for every referenced range
+
+        Returns:
+            Result of the expression
+        """
+
+        if self.error is not None:
+            raise ValueError(f"Evaluation error: {self.error}")
+        values = [lookup(row, col) for row, col in self.references]
+        values += [column_lookup(col) for col in self.columns]
+        values += [range_lookup(col, first, last) for col, first, last in self.ranges]
+        try:
+            if self.columns:
+                # Invalid operations (division by zero, log of negatives) yield NaN/inf per row
+                with np.errstate(all='ignore'):
+                    return self._function(values)
+            result = self._function(values)
+        except Exception as e:
+            raise ValueError(f"Evaluation error: {str(e)}")
+        if isinstance(result, np.ndarray):
+            raise ValueError("Evaluation error: a range must be reduced by an aggregate function")
+        if isinstance(result, np.generic):
+            return result.item()
+        return result
+
+
+class FormulaCompiler:
+    """Compiles formula text into CompiledFormula objects and caches them by text."""
+
+    def __init__(self, operators: dict, functions: dict, column_resolver, cell_pattern: str):
+        """
+        Args:
+            operators: Mapping of AST operator types to their implementation
+            functions: Whitelisted functions and constants available in formulas
+            column_resolver: Callable converting a column name to its index
+            cell_pattern: Regular expression matching '[Column]row' references
+        """
+
+        self.operators = operators
+        self.functions = functions
+        self.column_resolver = column_resolver
+        self.cell_pattern = re.compile(cell_pattern)
+        self.column_pattern = re.compile(COLUMN_PATTERN)
+        self.range_pattern = re.compile(RANGE_PATTERN)
+        self.vector_functions = {name: VECTOR_FUNCTIONS[name] for name in functions if name in VECTOR_FUNCTIONS}
+        self._cache = {}  # {formula text: CompiledFormula}
+
+    def clear(self) -> None:
+        """Forget all compiled formulas (column names or positions have changed)."""
+
+        self._cache.clear()
+
+    def compile(self, formula: str) -> CompiledFormula:
+        """Return the compiled object for the formula, compiling it on first use."""
+
+        compiled = self._cache.get(formula)
+        if compiled is None:
+            compiled = self._compile(formula)
+            self._cache[formula] = compiled
+        return compiled
+
+    def compile_shifted(self, formula: str, base: CompiledFormula, row_offset: int, col_offset: int) -> CompiledFormula:
+        """
+        Return the compiled object for a copy of a formula moved by some rows and columns
+        (see FormulaTemplate). The copy shares the closure tree of the original and only
+        its references are moved, so it isn't parsed again.
+
+        Args:
+            formula: Text of the moved copy; every cell reference must have been moved
+            base: Compiled original formula
+            row_offset, col_offset: Offsets of the copy
+        """
+
+        compiled = self._cache.get(formula)
+        if compiled is None:
+            if base.error is not None or base.columns:
+                return self.compile(formula)
+            # Whole-column ranges (e.g. mean([A])) are written without rows and aren't moved
+            ranges = [(col, first, last) if last is None else (col + col_offset, first + row_offset, last + row_offset)
+                      for col, first, last in base.ranges]
+            compiled = CompiledFormula(formula, [(row + row_offset, col + col_offset) for row, col in base.references],
+                                       base._function, ranges=ranges)
+            self._cache[formula] = compiled
+        return compiled
+
+    def _compile(self, formula: str) -> CompiledFormula:
+        """Parse, validate and convert the formula into a closure tree."""
+
+        references = []
+        columns = []
+        ranges = []
+
+        def replace_match(match):
+            col_index = self.column_resolver(match.group(2).upper())
+            references.append((int(match.group(3)) - 1, col_index))
+            return REFERENCE_PLACEHOLDER.format(len(references) - 1)
+
+        def replace_range(match):
+            col_index = self.column_resolver(match.group(1).upper())
+            if self.column_resolver(match.group(3).upper()) != col_index:
+                raise ValueError("A range must stay within one column")
+            first, last = sorted((int(match.group(2)) - 1, int(match.group(4)) - 1))
+            ranges.append((col_index, first, last))
+            return RANGE_PLACEHOLDER.format(len(ranges) - 1)
+
+        def replace_column(match):
+            columns.append(self.column_resolver(match.group(1).upper()))
+            return COLUMN_PLACEHOLDER.format(len(columns) - 1)
+
+        try:
+            # Remove the equals sign and any spaces
+            expression = formula[1:].replace(' ', '')
+            expression = expression.split(", ")[0]
+
+            # Replace Excel-style power operator (^) with Python-style (**)
+            expression = expression.replace('^', '**')
+
+            # Replace every range and cell reference with a placeholder name
+            expression = self.range_pattern.sub(replace_range, expression)
+            expression = self.cell_pattern.sub(replace_match, expression)
+            expression = self.column_pattern.sub(replace_column, expression)
+
+            tree = ast.parse(expression, mode='eval')
+            column_names = [COLUMN_PLACEHOLDER.format(i) for i in range(len(columns))]
+            range_names = [RANGE_PLACEHOLDER.format(i) for i in range(len(ranges))]
+            if columns and self._only_aggregated(tree, set(column_names)):
+                # e.g. =mean([A]): the whole column is a range and the result a single value
+                range_names += column_names
+                ranges += [(col, 0, None) for col in columns]
+                columns = []
+                column_names = []
+            # Values are passed in the order: cell references, columns, ranges
+            names = [REFERENCE_PLACEHOLDER.format(i) for i in range(len(references))] + column_names + range_names
+            placeholders = {name: position for position, name in enumerate(names)}
+            if any(col < 0 for col in columns):
+                raise ValueError("Unknown column in column formula")
+            if any(col < 0 for col, _, _ in ranges):
+                raise ValueError("Unknown column in range")
+            function = self._build(tree.body, placeholders, vector=bool(columns))
+        except Exception as e:
+            return CompiledFormula(formula, references, error=str(e), columns=columns, ranges=ranges)
+        return CompiledFormula(formula, references, function, columns=columns, ranges=ranges)
+
+    @staticmethod
+    def _only_aggregated(tree, names: set) -> bool:
+        """Check if every use of the given names is a direct argument of an aggregate function."""
+
+        uses = 0
+        aggregated = 0
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Name) and node.id in names:
+                uses += 1
+            elif (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+                  and node.func.id in RANGE_FUNCTIONS):
+                aggregated += sum(isinstance(arg, ast.Name) and arg.id in names for arg in node.args)
+        return uses == aggregated
+
+    def _build(self, node, placeholders: dict, vector: bool = False):
+        """
+        Recursively convert an AST node into a closure taking the reference values.
+        With vector=True functions are taken from their NumPy counterparts.
+        """
+
+        functions = self.vector_functions if vector else self.functions
+
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float, complex, str)):
+            value = node.value
+            return lambda values: value
+
+        elif isinstance(node, ast.BinOp):
+            left = self._build(node.left, placeholders, vector)
+            right = self._build(node.right, placeholders, vector)
+            operator_type = type(node.op)
+            if operator_type not in self.operators:
+                raise ValueError(f"Unsupported operator: {operator_type}")
+            operation = self.operators[operator_type]
+
+            if operator_type is ast.Pow:
+                # Ensure we don't allow very large exponents for safety
+                def power(values):
+                    exponent = right(values)
+                    too_large = np.any(np.abs(exponent) > MAXIMUM_EXPONENT) if vector else abs(exponent) > MAXIMUM_EXPONENT
+                    if too_large:
+                        raise ValueError("Exponent too large")
+                    return operation(left(values), exponent)
+                return power
+            return lambda values: operation(left(values), right(values))
+
+        elif isinstance(node, ast.UnaryOp):
+            operand = self._build(node.operand, placeholders, vector)
+            operator_type = type(node.op)
+            if operator_type not in self.operators:
+                raise ValueError(f"Unsupported operator: {operator_type}")
+            operation = self.operators[operator_type]
+            return lambda values: operation(operand(values))
+
+        elif isinstance(node, ast.Call):
+            # Handle function calls
+            if not isinstance(node.func, ast.Name):
+                raise ValueError("Unsupported function call type")
+            func_name = node.func.id
+            if func_name not in functions:
+                raise ValueError(f"Unsupported function: {func_name}")
+            function = functions[func_name]
+            if not vector and func_name in RANGE_FUNCTIONS:
+                function = self._range_aware(function, RANGE_FUNCTIONS[func_name])
+            args = [self._build(arg, placeholders, vector) for arg in node.args]
+            return lambda values: function(*[arg(values) for arg in args])
+
+        elif isinstance(node, ast.Name):
+            # Cell reference placeholders
+            if node.id in placeholders:
+                position = placeholders[node.id]
+                return lambda values: values[position]
+            # Handle named constants
+            if node.id in functions and not callable(functions[node.id]):
+                value = functions[node.id]
+                return lambda values: value
+            raise ValueError(f"Unknown name: {node.id}")
+
+        raise ValueError(f"Unsupported expression type: {type(node)}")
+
+    @staticmethod
+    def _range_aware(function, range_function):
+        """Use the vectorized aggregate when any argument is a range, the plain function otherwise."""
+
+        def call(*args):
+            if any(isinstance(arg, np.ndarray) for arg in args):
+                return range_function(*args)
+            return function(*args)
+        return call
@@ -9,21 +9,26 @@ from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 import matplotlib.gridspec as gridspec
 from dialogs import AxisConfigDialog, LegendConfigDialog, TitleConfigDialog, LineLabelDialog
-from PyQt6.QtWidgets import QMessageBox, QMenu, QDialog
+from PyQt6.QtWidgets import QMessageBox, QMenu, QDialog, QLabel
 from PyQt6.QtGui import QAction
-from PyQt6.QtCore import pyqtSignal, QPoint
+from PyQt6.QtCore import pyqtSignal, QPoint, QTimer, QThreadPool, Qt
 import matplotlib.ticker as ticker
 from matplotlib.axes import Axes
+from matplotlib.container import ErrorbarContainer
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib as mpl
 from matplotlib.ticker import NullFormatter
 from dialogs import DataStyleDialog
+from point_index import PointIndex
+from tex_labels import TexCheckTask, tex_renderable
 
 
 # Constants and global parameters
 plt.rcParams['mathtext.fontset'] = 'cm'  # Use Computer Modern font for math text
 MAXIMUM_DISTANCE: int = 5  # Maximum distance in pixels for point detection
+CLICK_DISTANCE: int = 15  # Maximum distance in pixels for clicking a data point
+HOVER_INTERVAL: int = 16  # Minimum time between processed mouse movements in ms (about 60 Hz)
 
 
 class INTERACTIVE_PLOT(FigureCanvas):
@@ -58,12 +63,18 @@ class INTERACTIVE_PLOT(FigureCanvas):
         self.canvas = FigureCanvas(self.fig)
         self.data = None
         self.textes = dict()# Dictionary to store text annotations
+        self.series_artists = dict()  # plot id -> (axes, series layout, {series id: artist}, {series id: (data key, data)})
+        self.data_version = 0  # changes with the table, the cached data of the series is extracted again then
+        self.point_indexes = dict()  # axes -> PointIndex of its points, dropped on every draw
+        self.tex_checks = dict()  # label text -> TexCheckTask that is running
 
         # Connect matplotlib events to handler methods
         self.mpl_connect("button_press_event", self.on_click)
         self.mpl_connect("pick_event", self.on_pick)
         self.mpl_connect("motion_notify_event", self.on_mouse_move)
         self.mpl_connect("button_release_event", self.on_mouse_release)
+        self.mpl_connect("draw_event", self.on_draw)
+        self.mpl_connect("resize_event", self.on_resize)
 
         # Initialize interaction state variables
         self.context_menu = None
@@ -73,11 +84,25 @@ class INTERACTIVE_PLOT(FigureCanvas):
         self.current_subplot_id = None
         self.drawing_mode = False  # Flag to track if line drawing is active
         self.temp_line = None      # Temporary line object during drawing
+        self.hover_marker = None   # Highlight of the data point under the cursor
+        self.selection_marker = None  # Highlight of the picked line
+        self.background = None     # Rendered figure without the animated artists, for blitting
         self.start_point = None    # Starting coordinates for line drawing
         self.current_label = None  # Currently active label object
         self.last_hovered_point = None
-        self.context_menu = None
-        self.hover_timer = None
+        self.pending_motion = None  # Latest mouse movement that wasn't processed yet
+
+        # Mouse movements are coalesced: at most one is processed per HOVER_INTERVAL
+        self.hover_timer = QTimer(self)
+        self.hover_timer.setSingleShot(True)
+        self.hover_timer.timeout.connect(self.process_mouse_move)
+
+        # Overlay with the information about the point under the cursor
+        self.point_tooltip = QLabel(self.canvas)
+        self.point_tooltip.setStyleSheet("background-color: #ffffe1; color: black; "
+                                         "border: 1px solid #767676; padding: 2px 4px;")
+        self.point_tooltip.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.point_tooltip.hide()
 
     def on_click(self, event):
         """
@@ -169,36 +194,28 @@ class INTERACTIVE_PLOT(FigureCanvas):
                             return
     
     def find_closest_point(self, event, ax):
-        """Find the data point closest to the click location."""
+        """Find the data point of a series closest to the click location."""
 
-        closest_point = None
-        min_distance = float('inf')
-        
-        for line in ax.get_lines():
-            if not line.get_visible() or not hasattr(line, '_series_id'):
-                continue
-                
-            # Getting the line data
-            xdata, ydata = line.get_data()
-            if len(xdata) == 0:
-                continue
-                
-            # Преобразуем координаты данных в экранные координаты
-            xy_pixels = ax.transData.transform(np.column_stack([xdata, ydata]))
-            
-            # Converting data coordinates to screen coordinates
-            distances = np.sqrt((xy_pixels[:, 0] - event.x)**2 + (xy_pixels[:, 1] - event.y)**2)
-            
-            # Find the minimum distance
-            idx = np.argmin(distances)
-            distance = distances[idx]
-            
-            # If this is the closest point, save the information.
-            if distance < min_distance and distance < 15: # 15 pixels is the maximum distance
-                min_distance = distance
-                closest_point = (line, xdata[idx], ydata[idx], line._series_id)
-        
-        return closest_point
+        found = self.point_index(ax).nearest(event.x, event.y, CLICK_DISTANCE,
+                                             accept=lambda line: hasattr(line, '_series_id'))
+        if found is None:
+            return None
+        line, index, distance = found
+        xdata, ydata = line.get_data()
+        return (line, xdata[index], ydata[index], line._series_id)
+
+    def point_index(self, ax: Axes) -> PointIndex:
+        """
+        Get the spatial index of the points of the visible lines of an axes.
+        It is built on the first lookup after a draw, or after the limits or size of the axes changed.
+        """
+
+        index = self.point_indexes.get(ax)
+        if index is None or not index.is_valid(ax):
+            lines = [line for line in ax.get_lines() if line.get_visible() and not line.get_animated()]
+            index = PointIndex(ax, lines)
+            self.point_indexes[ax] = index
+        return index
 
     def find_subplot(self, id: int) -> tuple[int, dict]:
         """find subplot with approprate subplot id"""
@@ -242,8 +259,9 @@ class INTERACTIVE_PLOT(FigureCanvas):
 
 
         # Line selection processing
-        if isinstance(event.artist, mpl.lines.Line2D):
+        if isinstance(event.artist, mpl.lines.Line2D) and not event.artist.get_animated():
             self.current_line = event.artist
+            self.set_selection(self.current_line)
             # Get subplot_id from parent widget
             parent = self.parent()  # INTERACTIVE_PLOT -> QWidget -> QScrollArea -> SubplotEditor
             if parent:
@@ -352,6 +370,7 @@ class INTERACTIVE_PLOT(FigureCanvas):
         del self.axes
         self.axes = {}
         self.textes = dict()
+        self.series_artists = dict()
         # Create GridSpec
         self.gs = gridspec.GridSpec(
             rows, cols, 
@@ -394,11 +413,16 @@ class INTERACTIVE_PLOT(FigureCanvas):
     
     def update_one_plot(self, subplot, win):
         """
-        Update and redraw a single subplot with current configuration
+        Update and redraw a single subplot with current configuration.
+        The artists of the data series are updated in place; the axes are cleared
+        and every series is plotted again only when the set of series changes.
         
         Args:
             subplot: Subplot configuration data
             win: Parent window reference for data access
+
+        Returns:
+            The updated axes
         """
 
         plot_id, s_row, s_col, s_row_span, s_col_span, data_series, sub_info, lines = subplot
@@ -407,15 +431,55 @@ class INTERACTIVE_PLOT(FigureCanvas):
         legend_info = sub_info["legend"]
         grid_info = sub_info["grid"]
         ax: Axes = self.axes[plot_id]
-        ax.clear()
-    
-        # Plot all series
+
+        # Extract the data of all series; the cached data of a series is used
+        # until the table or the columns of the series change
+        registry = self.series_artists.get(plot_id)
+        cached = registry[3] if registry is not None else {}
+        plotted = []
         for series in data_series:
             if series['x'] != "None" and series['y'] != "None":
-                if series['xerr'] != "None" or series['yerr'] != "None":
+                # The width of the canvas is part of the key, as it sets the rows taken from external columns
+                key = (series['x'], series['y'], series['xerr'], series['yerr'], self.data_version, self.canvas.width())
+                entry = cached.get(series.get('id', 0))
+                if entry is not None and entry[0] == key:
+                    data: np.ndarray = entry[1]
+                elif series['xerr'] != "None" or series['yerr'] != "None":
                     data: np.ndarray = win.get_error_data(x=series['x'], y=series['y'], xerr=series['xerr'], yerr=series['yerr'])
-                    if data.size != 0:
-                        container = ax.errorbar(x=data[0], y=data[2],xerr=data[1], yerr=data[3],
+                else:
+                    data: np.ndarray = win.get_data(series['x'], series['y'])
+                if data.size != 0:
+                    plotted.append((series, key, data))
+        layout = [(series.get('id', 0), len(data)) for series, key, data in plotted]
+
+        artists = None
+        if registry is not None and registry[0] is ax and registry[1] == layout:
+            artists, shown = registry[2], registry[3]
+            for series, key, data in plotted:
+                series_id = series.get('id', 0)
+                shown_data = shown[series_id][1]
+                changed = shown_data is not data and not np.array_equal(shown_data, data)
+                if not self.update_series_artist(artists[series_id], series, data, changed):
+                    artists = None
+                    break
+
+        if artists is None:
+            # Plot all series
+            ax.clear()
+            self.textes.pop(plot_id, None)
+            artists = {}
+            for series, key, data in plotted:
+                if len(data) == 4:
+                    artist = ax.errorbar(x=data[0], y=data[2],xerr=data[1], yerr=data[3],
+                        linewidth=series['width'], 
+                        color=series['color'],
+                        label=series['label'], 
+                        ls=series["ls"],
+                        alpha=series["alpha"],
+                        marker=series["marker"],
+                        markersize=series["marker size"])
+                else:
+                    artist, = ax.plot(data[0], data[1], 
                             linewidth=series['width'], 
                             color=series['color'],
                             label=series['label'], 
@@ -423,19 +487,27 @@ class INTERACTIVE_PLOT(FigureCanvas):
                             alpha=series["alpha"],
                             marker=series["marker"],
                             markersize=series["marker size"])
-                        line = container.lines[0] if container.lines else None
-                    
+                artists[series.get('id', 0)] = artist
+            # Series with the same id can't be told apart, so they are always plotted again
+            self.series_artists[plot_id] = (ax, layout if len(artists) == len(plotted) else None, artists,
+                                            {series.get('id', 0): (key, data) for series, key, data in plotted})
+        else:
+            registry[3].update((series.get('id', 0), (key, data)) for series, key, data in plotted)
+            # Lines drawn on top of the data are few, so they are simply drawn again
+            series_lines = set()
+            for artist in artists.values():
+                if isinstance(artist, ErrorbarContainer):
+                    series_lines.add(artist.lines[0])
+                    series_lines.update(artist.lines[1])
                 else:
-                    data: np.ndarray = win.get_data(series['x'], series['y'])
-                    if data.size != 0:
-                        line = ax.plot(data[0], data[1], 
-                                linewidth=series['width'], 
-                                color=series['color'],
-                                label=series['label'], 
-                                ls=series["ls"],
-                                alpha=series["alpha"],
-                                marker=series["marker"],
-                                markersize=series["marker size"])
+                    series_lines.add(artist)
+            for line in ax.get_lines():
+                # Previews and highlights are kept, they are drawn by blitting
+                if line not in series_lines and not line.get_animated():
+                    line.remove()
+            for text in self.textes.pop(plot_id, {}).values():
+                if text.axes is not None:
+                    text.remove()
     
         ax.set_title(title_info["title"], fontsize=title_info["title fs"])
         if grid_info["show grid"]:
@@ -500,12 +572,8 @@ class INTERACTIVE_PLOT(FigureCanvas):
             ax.set_xscale("linear")
         else:
             ax.set_xscale("log")
-        try:
-            ax.set_xlabel(axes_info["x-label"], loc="center", fontsize=axes_info["x label fs"], usetex=True)
-            self.canvas.draw()
-            plt.draw()
-        except Exception as e:
-            ax.set_xlabel(axes_info["x-label"], loc="center", fontsize=axes_info["x label fs"], usetex=False)
+        ax.set_xlabel(axes_info["x-label"], loc="center", fontsize=axes_info["x label fs"],
+                      usetex=self.label_usetex(axes_info["x-label"]))
 
         ax.xaxis.set_major_formatter(ticker.FuncFormatter(zero_formatter_x))
         ax.xaxis.set_ticks_position("bottom")
@@ -523,11 +591,8 @@ class INTERACTIVE_PLOT(FigureCanvas):
             ax.set_yscale("linear")
         else:
             ax.set_yscale("log")
-        try:
-            ax.set_ylabel(axes_info["y-label"], loc="center", fontsize=axes_info["y label fs"], usetex=True)
-            plt.draw()
-        except Exception as e:
-            ax.set_ylabel(axes_info["y-label"], loc="center", fontsize=axes_info["y label fs"], usetex=False)
+        ax.set_ylabel(axes_info["y-label"], loc="center", fontsize=axes_info["y label fs"],
+                      usetex=self.label_usetex(axes_info["y-label"]))
 
 
         ax.yaxis.set_major_formatter(ticker.FuncFormatter(zero_formatter_y))        
@@ -553,9 +618,93 @@ class INTERACTIVE_PLOT(FigureCanvas):
 
         # Add picker functionality to lines
         for line in ax.get_lines():
+            if line.get_animated():
+                continue
             line.set_picker(5)  # 5 pixels tolerance
-            line._series_id = series.get('id', 0) if 'series' in locals() else 0
             line._subplot_id = plot_id
+        for series_id, artist in artists.items():
+            line = artist.lines[0] if isinstance(artist, ErrorbarContainer) else artist
+            line._series_id = series_id
+
+        return ax
+
+    def invalidate_series_data(self, *args) -> None:
+        """Drop the cached data of all series after the table changed."""
+
+        self.data_version += 1
+
+    def label_usetex(self, text: str) -> bool:
+        """
+        Decide if an axis label is rendered with TeX.
+        A text that wasn't checked yet is drawn without TeX and checked on a worker thread;
+        the label switches to TeX when the check succeeds.
+        """
+
+        renderable = tex_renderable(text)
+        if renderable is not None:
+            return renderable
+        if text not in self.tex_checks:
+            task = TexCheckTask(text)
+            task.signals.finished.connect(self.on_tex_checked)
+            self.tex_checks[text] = task
+            QThreadPool.globalInstance().start(task)
+        return False
+
+    def on_tex_checked(self, text: str, renderable: bool) -> None:
+        """Switch the axis labels with a checked text to TeX if it can be rendered."""
+
+        self.tex_checks.pop(text, None)
+        if not renderable:
+            return
+        changed = False
+        for ax in self.axes.values():
+            for label in (ax.xaxis.label, ax.yaxis.label):
+                if label.get_text() == text and not label.get_usetex():
+                    label.set_usetex(True)
+                    changed = True
+        if changed:
+            self.canvas.draw_idle()
+
+    def update_series_artist(self, artist, series: dict, data: np.ndarray, changed: bool = True) -> bool:
+        """
+        Update the data and style of a plotted series in place.
+
+        Args:
+            artist: Line2D of the series, or ErrorbarContainer for a series with errors
+            series: Series settings
+            data: Series data as returned by get_data/get_error_data
+            changed: False if the artist already shows this data, then only the style is set
+
+        Returns:
+            False if the artist can't be updated and the series must be plotted again
+        """
+
+        style = dict(linewidth=series['width'], color=series['color'], linestyle=series["ls"],
+                     alpha=series["alpha"], marker=series["marker"], markersize=series["marker size"])
+        if not isinstance(artist, ErrorbarContainer):
+            if len(data) != 2:
+                return False
+            if changed:
+                artist.set_data(data[0], data[1])
+            artist.set(label=series['label'], **style)
+            return True
+
+        if len(data) != 4:
+            return False
+        data_line, caplines, barcols = artist.lines
+        if data_line is None or caplines or not (artist.has_xerr and artist.has_yerr) or len(barcols) != 2:
+            return False
+        if changed:
+            x, xerr, y, yerr = data
+            data_line.set_data(x, y)
+            # The error bars are one segment per point, as drawn by errorbar
+            barcols[0].set_segments(np.stack([np.column_stack([x - xerr, y]), np.column_stack([x + xerr, y])], axis=1))
+            barcols[1].set_segments(np.stack([np.column_stack([x, y - yerr]), np.column_stack([x, y + yerr])], axis=1))
+        data_line.set(**style)
+        for barcol in barcols:
+            barcol.set(color=series['color'], linewidth=series['width'], alpha=series["alpha"])
+        artist.set_label(series['label'])
+        return True
 
     def draw_line(self, params, ax=None):
         """Draws a line on the graph based on parameters"""
@@ -713,9 +862,9 @@ class INTERACTIVE_PLOT(FigureCanvas):
         self.drawing_mode = enabled
         self.start_point = None
         if self.temp_line:
-            self.temp_line.remove()
+            self.remove_animated(self.temp_line)
             self.temp_line = None
-        self.canvas.draw_idle()
+            self.update_animated()
     
     def on_motion(self, event):
         """
@@ -729,17 +878,118 @@ class INTERACTIVE_PLOT(FigureCanvas):
         if not event.inaxes or not self.drawing_mode or not self.start_point:
             return
             
-        # Remove previous temporary line
-        if self.temp_line:
-            self.temp_line.remove()
-            
-        # Create new temporary line
-        self.temp_line, = event.inaxes.plot(
-            [self.start_point[0], event.xdata],
-            [self.start_point[1], event.ydata],
-            'r--', linewidth=1  # Red dashed preview line
-        )
-        self.canvas.draw_idle()
+        # The preview line is created once per axes and moved afterwards
+        if not self.is_attached(self.temp_line) or self.temp_line.axes is not event.inaxes:
+            self.remove_animated(self.temp_line)
+            self.temp_line, = event.inaxes.plot(
+                [], [],
+                'r--', linewidth=1,  # Red dashed preview line
+                animated=True
+            )
+        self.temp_line.set_data([self.start_point[0], event.xdata], [self.start_point[1], event.ydata])
+        self.update_animated()
+
+    def on_draw(self, event) -> None:
+        """
+        Cache the rendered figure as the background for blitting and draw the
+        animated artists (line preview, hover and selection highlights) on top of it.
+        """
+
+        # The data of the lines may have changed since the last draw
+        self.point_indexes.clear()
+        # The figure is also rendered by the other canvas; only the shown one is blitted
+        if event.renderer is not self.canvas.get_renderer():
+            return
+        if self.selection_marker is not None and not self.is_attached(self.selection_marker._target):
+            self.remove_animated(self.selection_marker)
+            self.selection_marker = None
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self.draw_animated()
+
+    def on_resize(self, event) -> None:
+        """Drop the cached background and point indexes, they no longer fit the canvas."""
+
+        self.background = None
+        self.point_indexes.clear()
+
+    def is_attached(self, artist) -> bool:
+        """Check if an artist is still shown, i.e. was not removed by clearing its axes."""
+
+        return (artist is not None and artist.axes is not None and artist.axes in self.fig.axes
+                and artist in artist.axes.lines)
+
+    def remove_animated(self, artist) -> None:
+        """Remove an animated artist if it is still shown."""
+
+        if self.is_attached(artist):
+            artist.remove()
+
+    def draw_animated(self) -> None:
+        """Draw the animated artists with the renderer of the shown canvas."""
+
+        for artist in (self.selection_marker, self.temp_line, self.hover_marker):
+            if self.is_attached(artist) and artist.get_visible():
+                self.fig.draw_artist(artist)
+
+    def update_animated(self) -> None:
+        """
+        Show the changes of the animated artists: the cached background is restored
+        and only the animated artists are drawn again, instead of rendering the figure.
+        """
+
+        if self.background is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self.background)
+        self.draw_animated()
+        self.canvas.blit(self.fig.bbox)
+
+    def set_hover_marker(self, ax: Axes, point: tuple | None) -> None:
+        """
+        Highlight the data point under the cursor.
+
+        Args:
+            ax: Axes of the point
+            point: (x, y) of the point, or None to remove the highlight
+        """
+
+        marker = self.hover_marker
+        if point is None:
+            if not self.is_attached(marker) or not marker.get_visible():
+                return
+            marker.set_visible(False)
+        else:
+            if not self.is_attached(marker) or marker.axes is not ax:
+                self.remove_animated(marker)
+                marker, = ax.plot([], [], 'o', markersize=9, markerfacecolor='none', markeredgecolor='#d62728',
+                                  markeredgewidth=1.5, zorder=10, animated=True)
+                self.hover_marker = marker
+            elif marker.get_visible() and (marker.get_xdata()[0], marker.get_ydata()[0]) == tuple(point):
+                return
+            marker.set_data([point[0]], [point[1]])
+            marker.set_visible(True)
+        self.update_animated()
+
+    def set_selection(self, line) -> None:
+        """
+        Highlight a picked line with a wider translucent copy of it.
+
+        Args:
+            line: Picked line, or None to remove the highlight
+        """
+
+        self.remove_animated(self.selection_marker)
+        self.selection_marker = None
+        if line is not None and line.axes is not None:
+            self.selection_marker, = line.axes.plot(
+                *line.get_data(),
+                color=line.get_color(), alpha=0.35,
+                linestyle=line.get_linestyle(), linewidth=line.get_linewidth() + 4,
+                marker=line.get_marker(), markersize=line.get_markersize() + 4,
+                solid_capstyle='round', animated=True
+            )
+            self.selection_marker._target = line
+        self.update_animated()
 
     def finish_line(self, end_point):
         """
@@ -751,7 +1001,7 @@ class INTERACTIVE_PLOT(FigureCanvas):
 
         # Remove temporary line
         if self.temp_line:
-            self.temp_line.remove()
+            self.remove_animated(self.temp_line)
             self.temp_line = None
             
         # Create permanent line
@@ -875,98 +1125,96 @@ class INTERACTIVE_PLOT(FigureCanvas):
     
     
     def on_mouse_move(self, event) -> None:
-        """Mouse movement handler for detrmining points under the cursor"""
+        """
+        Mouse movement handler. Only the latest movement is kept; it is processed
+        right away, or when HOVER_INTERVAL has passed since the previous one was processed.
+        """
+
+        self.pending_motion = event
+        if not self.hover_timer.isActive():
+            self.process_mouse_move()
+
+    def process_mouse_move(self) -> None:
+        """Process the latest mouse movement: update the line preview or find the point under the cursor"""
+
+        event = self.pending_motion
+        if event is None:
+            return
+        self.pending_motion = None
+        self.hover_timer.start(HOVER_INTERVAL)
+
+        if self.drawing_mode and self.start_point:
+            self.on_motion(event)
+            return
 
         if not event.inaxes:
-            self.hide_context_menu()
+            self.hide_point_tooltip()
             return
         
-        # Check all lines in the current axes
-        for line in event.inaxes.get_lines():
-            if not line.get_visible():
-                continue
-                
-            # Check if the cursor is near to the point
-            point_info = self.get_point_near_cursor(event, line)
-            if point_info:
-                x, y, index, distance = point_info
-                if distance < MAXIMUM_DISTANCE:  # check the distance between cursor and point
-                    self.show_context_menu_point(event, line, x, y)
-                    return
+        # Check if the cursor is near to a point of any line in the current axes
+        point_info = self.get_point_near_cursor(event)
+        if point_info:
+            line, x, y, index, distance = point_info
+            self.set_hover_marker(event.inaxes, (x, y))
+            self.show_point_tooltip(event, line, x, y)
+            return
         
-        # If there is no point under cursor hide the context menu
-        self.hide_context_menu()
+        # If there is no point under cursor hide the tooltip
+        self.hide_point_tooltip()
 
-    def get_point_near_cursor(self, event, line) -> tuple[int]:
-        """find the nearest point to the cursor"""
+    def get_point_near_cursor(self, event) -> tuple | None:
+        """find the nearest point to the cursor within MAXIMUM_DISTANCE"""
 
-        xdata, ydata = line.get_data()
-        if len(xdata) == 0:
+        found = self.point_index(event.inaxes).nearest(event.x, event.y, MAXIMUM_DISTANCE)
+        if found is None:
             return None
-        
-        # transform plot coords to the canvas coords
-        xy_pixels = line.get_transform().transform(np.column_stack([xdata, ydata]))
-        
-        # distnace between cursot to each point
-        distances = np.sqrt((xy_pixels[:, 0] - event.x)**2 + (xy_pixels[:, 1] - event.y)**2)
-        
-        min_index = np.argmin(distances)
-        min_distance = distances[min_index]
-        
-        return (xdata[min_index], ydata[min_index], min_index, min_distance)
+        line, index, distance = found
+        xdata, ydata = line.get_data()
+        return (line, xdata[index], ydata[index], index, distance)
     
 
-    def show_context_menu_point(self, event, line, x, y):
-        """shows context menu with point info"""
+    def show_point_tooltip(self, event, line, x, y):
+        """shows tooltip with point info next to the cursor"""
 
-        # If cursor is over the same point, don't update menu
+        # If cursor is over the same point, the tooltip stays as it is
         current_point = (line, x, y)
-        if self.last_hovered_point == current_point:
+        if self.last_hovered_point == current_point and self.point_tooltip.isVisible():
             return
             
         self.last_hovered_point = current_point
         
-        # Create or update context menu
-        if not self.context_menu:
-            self.context_menu = QMenu(self)
-        
-        # Clear menu
-        self.context_menu.clear()
-        
-        # Add point information
+        # Add point and line information
         x_str = f"{x:.4f}" if isinstance(x, float) else str(x)
         y_str = f"{y:.4f}" if isinstance(y, float) else str(y)
-        
-        point_action = self.context_menu.addAction(f"Point: ({x_str}, {y_str})")
-        point_action.setEnabled(False)
-        
-        # Add line information
         label = line.get_label() if line.get_label() else "Unnamed"
-        line_action = self.context_menu.addAction(f"Line: {label}")
-        line_action.setEnabled(False)
-        
-        # Show menu at cursor position (fixed to appear under cursor)
-        if hasattr(event, 'guiEvent'):
-            # Use the original Qt event coordinates for accurate positioning
-            qt_event = event.guiEvent
-            global_pos = qt_event.globalPosition().toPoint()
-        else:
-            # Fallback: calculate position based on event coordinates
-            global_pos = self.mapToGlobal(QPoint(int(event.x), int(event.y)))
+        self.point_tooltip.setText(f"Point: ({x_str}, {y_str})\nLine: {label}")
+        self.point_tooltip.adjustSize()
         
-        self.context_menu.popup(global_pos)
-
-    def hide_context_menu(self):
-        """hide contextt menu"""
-
-        if self.context_menu and self.context_menu.isVisible():
-            self.context_menu.hide()
+        # Matplotlib counts physical pixels from the bottom of the canvas, Qt counts logical pixels from the top
+        ratio = self.canvas.device_pixel_ratio
+        pos_x = int(event.x / ratio) + 12
+        pos_y = self.canvas.height() - int(event.y / ratio) + 12
+        # Keep the tooltip inside the canvas
+        if pos_x + self.point_tooltip.width() > self.canvas.width():
+            pos_x -= self.point_tooltip.width() + 24
+        if pos_y + self.point_tooltip.height() > self.canvas.height():
+            pos_y -= self.point_tooltip.height() + 24
+        self.point_tooltip.move(max(pos_x, 0), max(pos_y, 0))
+        self.point_tooltip.show()
+        self.point_tooltip.raise_()
+
+    def hide_point_tooltip(self):
+        """hide the point tooltip"""
+
+        if self.point_tooltip.isVisible():
+            self.point_tooltip.hide()
         self.last_hovered_point = None
+        self.set_hover_marker(None, None)
 
     def on_mouse_release(self, event):
         """Mose release handler"""
 
-        self.hide_context_menu()
+        self.hide_point_tooltip()
 
     def show_data_context_menu(self, event, line, x, y, series_id):
         """Shows context menu for editing data parameters"""
@@ -1005,4 +1253,4 @@ class INTERACTIVE_PLOT(FigureCanvas):
             # Fallback: calculate position based on event coordinates
             global_pos = self.mapToGlobal(QPoint(int(event.x), int(event.y)))
         
-        menu.popup(global_pos)
\ No newline at end of file
+        menu.popup(global_pos)
\ No newline at end of file
@@ -2,9 +2,9 @@ from PyQt6.QtWidgets import (QApplication, QMainWindow, QSplitter, QLabel,
                              QHeaderView, QMenu, QMessageBox, QInputDialog, QFileDialog,
                              QTableWidgetItem, QMenuBar, QDialog, QDialogButtonBox, QLineEdit,
                                QVBoxLayout, QHBoxLayout, QWidget, QGroupBox, QGridLayout,
-                               QSpinBox, QPushButton)
+                               QSpinBox, QPushButton, QProgressBar)
 from PyQt6 import QtWidgets
-from PyQt6.QtCore import Qt, QPoint, pyqtSignal
+from PyQt6.QtCore import Qt, QPoint, pyqtSignal, QThreadPool
 from PyQt6.QtGui import QAction, QKeySequence
 
 import json
@@ -17,6 +17,13 @@ from theme_manager import ThemeManager
 from plot_manager import SubplotEditor
 from core import AutoSaveManager
 from table import ExcelLikeModel, ExcelTableView, FormulaLineEdit
+from csv_import import CsvImportTask, CsvTable
+from spreadsheet_import import SPREADSHEET_EXTENSIONS, SpreadsheetImportTask, sheet_names
+from project_format import PROJECT_EXTENSION, read_project, write_project
+from external_data import RAW_DTYPES
+
+
+PLOT_POINTS_PER_PIXEL: int = 4  # Points of an external column plotted per pixel of the plot width
 
 
 
@@ -44,6 +51,7 @@ class ZAVLABMainWindow(QMainWindow):
         super().__init__()
 
         self.theme = 'default'
+        self._import_task: CsvImportTask | SpreadsheetImportTask | None = None  # File being loaded in the background
         
         self._configure_window()
         self._initialize_components()
@@ -127,6 +135,11 @@ class ZAVLABMainWindow(QMainWindow):
         """Connect internal signals between components."""
 
         self.data_updated.connect(self.plotter.update_column_data)
+        # The plot extracts the data of its series again only after the table changes
+        for signal in (self.model.dataChanged, self.model.headerDataChanged, self.model.modelReset,
+                       self.model.rowsInserted, self.model.rowsRemoved,
+                       self.model.columnsInserted, self.model.columnsRemoved):
+            signal.connect(self.plotter.plot_canvas.invalidate_series_data)
 
     def set_theme(self, theme_name: str) -> None:
         """Change application theme."""
@@ -165,7 +178,8 @@ class ZAVLABMainWindow(QMainWindow):
         #create table
         self.table: ExcelTableView = ExcelTableView()  
         self.table.table_headers_signal.connect(self.update_headers) 
-        self.model: ExcelLikeModel = ExcelLikeModel(20, 2)  # 10 rows, 2 columns initially
+        self.model: ExcelLikeModel = ExcelLikeModel(20, 2, columnar=True)  # 10 rows, 2 columns initially
+        self.model.set_background_recalculation(True)  # Large recalculations don't freeze the window
         self.table.setModel(self.model)
         
         # Add widgets to splitter
@@ -216,6 +230,7 @@ class ZAVLABMainWindow(QMainWindow):
         self.menu_bar: QMenuBar = self.menuBar()
         self.help_menu: QMenu = self.menu_bar.addMenu("Help")
         self.files: QMenu = self.menu_bar.addMenu("File")
+        self.edit_menu: QMenu = self.menu_bar.addMenu("Edit")
 
         #Help
         appInfo_action: QAction = QAction("Main information", self)
@@ -249,6 +264,23 @@ class ZAVLABMainWindow(QMainWindow):
         # new_action.triggered.connect(self._new_file)
         # self.files.addAction(new_action)
         
+        # Save table and plot settings as a binary project
+        save_project_action: QAction = QAction("Save project", self)
+        save_project_action.setShortcut(QKeySequence("Ctrl+S"))
+        save_project_action.triggered.connect(self._save_project)
+        self.files.addAction(save_project_action)
+        
+        # Open a binary project
+        load_project_action: QAction = QAction("Open project", self)
+        load_project_action.setShortcut(QKeySequence("Ctrl+Shift+O"))
+        load_project_action.triggered.connect(self._load_project)
+        self.files.addAction(load_project_action)
+        
+        # Attach a large data file as a read-only column
+        attach_data_action: QAction = QAction("Attach data column (.npy / binary)", self)
+        attach_data_action.triggered.connect(self._attach_data_column)
+        self.files.addAction(attach_data_action)
+        
         # Save table as JSON (with formulas)
         save_json_action: QAction = QAction("Save table (JSON with formulas)", self)
         save_json_action.setShortcut(QKeySequence("Ctrl+Shift+J"))
@@ -272,6 +304,10 @@ class ZAVLABMainWindow(QMainWindow):
         load_action.triggered.connect(self._load_csv)  # Changed to _load_csv
         self.files.addAction(load_action)
 
+        load_spreadsheet_action = QAction("Load table from spreadsheet (.xlsx)", self)
+        load_spreadsheet_action.triggered.connect(self._load_spreadsheet)
+        self.files.addAction(load_spreadsheet_action)
+
         # save plots settings
         save_plot_settings = QAction("Save plots settings", self)
         save_action.setShortcut(QKeySequence("Ctrl+Shift+P"))
@@ -290,6 +326,37 @@ class ZAVLABMainWindow(QMainWindow):
         save_plot_image.triggered.connect(self._save_plot_image)
         self.files.addAction(save_plot_image)
 
+        #Edit
+        undo_action = QAction("Undo", self)
+        undo_action.setShortcut(QKeySequence.StandardKey.Undo)
+        undo_action.triggered.connect(self._undo)
+        self.edit_menu.addAction(undo_action)
+
+        redo_action = QAction("Redo", self)
+        redo_action.setShortcut(QKeySequence.StandardKey.Redo)
+        redo_action.triggered.connect(self._redo)
+        self.edit_menu.addAction(redo_action)
+
+    def _undo(self) -> None:
+        """Undo the last table edit."""
+
+        try:
+            if not self.model.undo():
+                self.statusBar().showMessage("Nothing to undo", 2000)
+        except Exception as e:
+            QMessageBox.warning(self, "Undo", f"Cannot undo the edit: {str(e)}")
+        self.update_headers()
+
+    def _redo(self) -> None:
+        """Redo the last undone table edit."""
+
+        try:
+            if not self.model.redo():
+                self.statusBar().showMessage("Nothing to redo", 2000)
+        except Exception as e:
+            QMessageBox.warning(self, "Redo", f"Cannot redo the edit: {str(e)}")
+        self.update_headers()
+
     def tableDroppedHMenu(self, pos: QPoint) -> None:
         """Context menu for horizontal headers (column management)."""  
         
@@ -357,8 +424,10 @@ class ZAVLABMainWindow(QMainWindow):
         
         # Insert columns
         if ok and count > 0:
+            self.model.begin_macro()
             for _ in range(count):
                 self.model.insertColumn(position)
+            self.model.end_macro()
             
             # Update display
             self.table_headers_h.resizeSections(QHeaderView.ResizeMode.Stretch)
@@ -380,8 +449,10 @@ class ZAVLABMainWindow(QMainWindow):
         
         # Insert columns
         if ok and count > 0:
+            self.model.begin_macro()
             for _ in range(count):
                 self.model.insertColumn(position + 1)
+            self.model.end_macro()
             
             # Update display
             self.table_headers_h.resizeSections(QHeaderView.ResizeMode.Stretch)
@@ -403,8 +474,10 @@ class ZAVLABMainWindow(QMainWindow):
         
         # Insert rows
         if ok and count > 0:
+            self.model.begin_macro()
             for _ in range(count):
                 self.model.insertRow(position)
+            self.model.end_macro()
             # Update display
             self.table_headers_v.resizeSections(QHeaderView.ResizeMode.Stretch)
 
@@ -425,8 +498,10 @@ class ZAVLABMainWindow(QMainWindow):
         
         # Insert rows
         if ok and count > 0:
+            self.model.begin_macro()
             for _ in range(count):
                 self.model.insertRow(position + 1)
+            self.model.end_macro()
             # Update display
             self.table_headers_v.resizeSections(QHeaderView.ResizeMode.Stretch)
 
@@ -497,7 +572,10 @@ class ZAVLABMainWindow(QMainWindow):
             QMessageBox.critical(self, "Error", f"Failed to save file:\n{str(e)}")
 
     def _load_csv(self) -> None:
-        """Load data from CSV file into table."""
+        """Load data from CSV file into table.
+        
+        The file is parsed in chunks on a worker thread; progress is shown in the
+        status bar next to a button cancelling the import."""
         
         file_name: str
         _: str
@@ -510,44 +588,225 @@ class ZAVLABMainWindow(QMainWindow):
         
         if not file_name:
             return  # User cancelled
+        if self._import_task is not None:
+            QMessageBox.warning(self, "Import in progress", "Wait for the current import to finish or cancel it.")
+            return
         
-        try:
-            with open(file_name, 'r', newline='', encoding='utf-8') as csvfile:
-                reader = csv.reader(csvfile, delimiter=';')
-                
-                # Read headers
-                headers: list[str] = next(reader)
-                
-                # Set column count in model
-                self.model.setColumnCount(len(headers))
-                
-                # Set column names
-                for col, header in enumerate(headers):
-                    self.model.setHeaderData(col, Qt.Orientation.Horizontal, header)
-                
-                # Read data
-                data: list[list[str]] = list(reader)
-                
-                # Set row count in model
-                self.model.setRowCount(len(data))
-                
-                # Fill data
-                for row, row_data in enumerate(data):
-                    for col, value in enumerate(row_data):
-                        if col < self.model.columnCount():  # Protection against extra columns
-                            index = self.model.index(row, col)
-                            self.model.setData(index, value, Qt.ItemDataRole.EditRole)
-                
-                # Update headers and redraw table
-                self.update_headers()
-                self.table.viewport().update()
-                
-                self.statusBar().showMessage(f"File loaded: {file_name}", 5000)
-                QMessageBox.information(self, "Success", "Data successfully loaded from CSV!")
+        self._start_import(CsvImportTask(file_name))
+
+    def _load_spreadsheet(self) -> None:
+        """Load a sheet of an Excel (.xlsx) workbook into the table.
+        
+        The first row holds the column names. The sheet is streamed on a worker thread
+        like a CSV file (see spreadsheet_import)."""
+        
+        patterns = " ".join(f"*{extension}" for extension in SPREADSHEET_EXTENSIONS)
+        file_name, _ = QFileDialog.getOpenFileName(
+            self,
+            "Open spreadsheet",
+            "",
+            f"Spreadsheets ({patterns});;All Files (*)"
+        )
         
+        if not file_name:
+            return  # User cancelled
+        if self._import_task is not None:
+            QMessageBox.warning(self, "Import in progress", "Wait for the current import to finish or cancel it.")
+            return
+        
+        sheet = None
+        try:
+            names = sheet_names(file_name)
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to load file:\n{str(e)}")
+            return
+        if len(names) > 1:
+            sheet, ok = QInputDialog.getItem(self, "Open spreadsheet", "Sheet:", names, 0, False)
+            if not ok:
+                return
+        reply = QMessageBox.question(
+            self,
+            "Formulas",
+            "Import simple formulas as table formulas?\nOther formulas are imported as their calculated values.",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        translate_formulas = reply == QMessageBox.StandardButton.Yes
+        
+        self._start_import(SpreadsheetImportTask(file_name, sheet, translate_formulas))
+
+    def _start_import(self, task: CsvImportTask | SpreadsheetImportTask) -> None:
+        """Run an import task on the thread pool with progress shown in the status bar."""
+        
+        task.signals.progress.connect(self._import_progress)
+        task.signals.finished.connect(self._import_finished)
+        task.signals.failed.connect(self._import_failed)
+        self._import_task = task
+        self._show_import_progress(True)
+        self.statusBar().showMessage(f"Loading file: {task.file_name}")
+        QThreadPool.globalInstance().start(task)
+
+    def _show_import_progress(self, visible: bool) -> None:
+        """Add or remove the import progress bar and cancel button in the status bar."""
+        
+        if visible:
+            self.import_progress: QProgressBar = QProgressBar()
+            self.import_progress.setRange(0, 100)
+            self.import_progress.setMaximumWidth(200)
+            self.import_cancel_button: QPushButton = QPushButton("Cancel")
+            self.import_cancel_button.clicked.connect(self._cancel_import)
+            self.statusBar().addPermanentWidget(self.import_progress)
+            self.statusBar().addPermanentWidget(self.import_cancel_button)
+        else:
+            for widget in (self.import_progress, self.import_cancel_button):
+                self.statusBar().removeWidget(widget)
+                widget.deleteLater()
+
+    def _import_progress(self, percent: int) -> None:
+        self.import_progress.setValue(percent)
+
+    def _cancel_import(self) -> None:
+        if self._import_task is not None:
+            self._import_task.cancel()
+            self.import_cancel_button.setEnabled(False)
+            self.statusBar().showMessage("Cancelling import...")
+
+    def _import_finished(self, table: CsvTable | None) -> None:
+        """Put the parsed CSV file or sheet into the table."""
+        
+        file_name = self._import_task.file_name
+        self._import_task = None
+        self._show_import_progress(False)
+        if table is None:
+            self.statusBar().showMessage("Import cancelled", 5000)
+            return
+        
+        # Fill the model in one step (extra columns are ignored)
+        self.model.load_columns(table.row_count, table.columns, table.headers)
+        
+        # Update headers and redraw table
+        self.update_headers()
+        self.table.viewport().update()
+        
+        self.statusBar().showMessage(f"File loaded: {file_name}", 5000)
+        QMessageBox.information(self, "Success", "Data successfully loaded!")
+
+    def _import_failed(self, message: str) -> None:
+        self._import_task = None
+        self._show_import_progress(False)
+        self.statusBar().clearMessage()
+        QMessageBox.critical(self, "Error", f"Failed to load file:\n{message}")
     
+    def _save_project(self) -> None:
+        """Save the table (with formulas) and plot settings to a binary project file."""
+        
+        file_name, _ = QFileDialog.getSaveFileName(
+            self,
+            "Save project",
+            "",
+            f"ZAVLAB Projects (*{PROJECT_EXTENSION});;All Files (*)"
+        )
+        if not file_name:
+            return  # User cancelled
+        
+        try:
+            if not file_name.endswith(PROJECT_EXTENSION):
+                file_name += PROJECT_EXTENSION
+            
+            table, columns, plots, _ = self.project_contents()
+            write_project(file_name, table, columns, plots)
+            
+            self.statusBar().showMessage(f"Project saved: {file_name}", 5000)
+        
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to save project:\n{str(e)}")
+
+    def _load_project(self) -> None:
+        """Load the table and plot settings from a binary project file."""
+        
+        file_name, _ = QFileDialog.getOpenFileName(
+            self,
+            "Open project",
+            "",
+            f"ZAVLAB Projects (*{PROJECT_EXTENSION});;All Files (*)"
+        )
+        if not file_name:
+            return  # User cancelled
+        
+        try:
+            self.apply_project(read_project(file_name))
+            self.statusBar().showMessage(f"Project loaded: {file_name}", 5000)
+        
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to load project:\n{str(e)}")
+
+    def _attach_data_column(self) -> None:
+        """Attach a .npy or raw binary file as a read-only column served from disk."""
+        
+        file_name, _ = QFileDialog.getOpenFileName(
+            self,
+            "Attach data column",
+            "",
+            "NumPy Arrays (*.npy);;Raw Binary Files (*)"
+        )
+        if not file_name:
+            return  # User cancelled
+        
+        dtype = None
+        if not file_name.lower().endswith('.npy'):
+            # Raw files don't describe their contents
+            dtype, ok = QInputDialog.getItem(self, "Raw binary file", "Number type:", RAW_DTYPES, 0, False)
+            if not ok:
+                return
+        
+        try:
+            col = self.model.attach_external_column(file_name, dtype)
+            self.update_headers()
+            self.statusBar().showMessage(
+                f"Data column attached: {self.model.headerData(col, Qt.Orientation.Horizontal)}", 5000)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to attach file:\n{str(e)}")
+
+    def project_contents(self) -> tuple[dict, list, dict | None, dict]:
+        """Return (table, columns, plots, extra) as stored in a project file (see project_format)."""
+        
+        table = {
+            "decimal_places": self.model.decimal_places,
+            "column_names": list(self.model._column_names),
+            "column_formulas": {str(col): formula for col, formula in self.model.get_column_formulas().items()},
+            "external_columns": {str(col): spec for col, spec in self.model.get_external_columns().items()},
+            "row_count": self.model.rowCount(),
+            "column_count": self.model.columnCount()
+        }
+        columns = [self.model.column_data(col) for col in range(self.model.columnCount())]
+        plots = self.convert_numpy_types(self.plotter.get_state()) if hasattr(self, 'plotter') else None
+        extra = {
+            "window": {
+                "geometry": self.saveGeometry().toHex().data().decode(),
+                "state": self.saveState().toHex().data().decode()
+            },
+            "splitter_sizes": [size for size in self.central_widget_splitter.sizes()]
+        }
+        return table, columns, plots, extra
+
+    def apply_project(self, project, restore_plots: bool = True) -> None:
+        """Load the table and plot settings of a project file."""
+        
+        table = project.table
+        self.model.load_columns(table["row_count"], project.columns, table["column_names"],
+                                table.get("column_formulas", {}), table.get("external_columns", {}))
+        
+        # Restore decimal places
+        if "decimal_places" in table:
+            self.model.set_decimal_places(table["decimal_places"])
+            self.decimal_spin.setValue(table["decimal_places"])
+        
+        # Update headers and redraw table
+        self.update_headers()
+        self.table.viewport().update()
+        
+        if restore_plots and project.plots and hasattr(self, 'plotter'):
+            self.plotter.set_state(project.plots)
+
     def _save_json(self) -> None:
         """Save table data to JSON file (including formulas)."""
         file_name, _ = QFileDialog.getSaveFileName(
@@ -566,8 +825,11 @@ class ZAVLABMainWindow(QMainWindow):
             # Get the complete table state including formulas
             table_state = {
                 "decimal_places": self.model.decimal_places,
-                "column_names": self.model._column_names,
-                "formulas": self.model._formulas,
+                "column_names": list(self.model._column_names),
+                # Trailing empty rows are restored from row_count
+                "formulas": self.model.get_formulas(self.model.used_row_count()),
+                "column_formulas": {str(col): formula for col, formula in self.model.get_column_formulas().items()},
+                "external_columns": {str(col): spec for col, spec in self.model.get_external_columns().items()},
                 "row_count": self.model.rowCount(),
                 "column_count": self.model.columnCount(),
                 "data": []  # We'll also store the evaluated data for compatibility
@@ -607,22 +869,11 @@ class ZAVLABMainWindow(QMainWindow):
             with open(file_name, 'r', encoding='utf-8') as f:
                 table_state = json.load(f)
             
-            # Set row and column count
-            self.model.setRowCount(table_state["row_count"])
-            self.model.setColumnCount(table_state["column_count"])
-            
-            # Restore column names
-            for col, name in enumerate(table_state["column_names"]):
-                self.model.setHeaderData(col, Qt.Orientation.Horizontal, name)
-            
-            # Restore formulas
-            for row in range(table_state["row_count"]):
-                for col in range(table_state["column_count"]):
-                    if row < len(table_state["formulas"]) and col < len(table_state["formulas"][row]):
-                        index = self.model.index(row, col)
-                        formula = table_state["formulas"][row][col]
-                        if formula:  # Only set if there's a formula
-                            self.model.setData(index, formula, Qt.ItemDataRole.EditRole)
+            # Restore size, column names, formulas and whole-column formulas in one step
+            self.model.load_block(table_state["row_count"], table_state["column_count"],
+                                  table_state["formulas"], table_state["column_names"],
+                                  table_state.get("column_formulas", {}),
+                                  table_state.get("external_columns", {}))
             
             # Restore decimal places
             if "decimal_places" in table_state:
@@ -642,72 +893,28 @@ class ZAVLABMainWindow(QMainWindow):
     def get_column_index(self, column_name:str) -> int:
         """Find column index by name"""
 
-        for col in range(self.table.model().columnCount()):
-            header = self.table.model().headerData(col, Qt.Orientation.Horizontal)
-            if header and header == column_name:
-                return col
-        return -1
+        return self.model.column_index(column_name)
 
     def get_data(self, x:int|str, y:int|str, lenght : int|None = None) -> np.ndarray:
         """Extract data from table for plotting."""
 
-        data = [[], []]
-        x_flag = True
-        y_flag = True
-        
         if type(x) == str:
             x = self.get_column_index(x)
         if type(y) == str:
             y = self.get_column_index(y)
         
         if x == -1 or y == -1:
-            return np.array(data)
+            return np.array([[], []])
         
-        if lenght == None:
-            lenght = self.table.model().rowCount() - 1
+        rows = self._plot_rows([x, y], lenght)
+        data = self.model.columns_array([x, y], rows)
         
-        for i in range(lenght + 1):
-            # Get X value
-            x_index = self.table.model().index(i, x)
-            item_x = self.table.model().data(x_index, Qt.ItemDataRole.DisplayRole)
-            x_flag = item_x is not None and item_x != ""
-            
-            # Get Y value
-            y_index = self.table.model().index(i, y)
-            item_y = self.table.model().data(y_index, Qt.ItemDataRole.DisplayRole)
-            y_flag = item_y is not None and item_y != ""
-            
-            try:
-                if x_flag:
-                    item_x = float(item_x)
-                else:
-                    item_x = 0
-                    x_flag = False
-            except ValueError:
-                item_x = 0
-                x_flag = False
-                
-            try:
-                if y_flag:
-                    item_y = float(item_y)
-                else:
-                    item_y = 0
-                    y_flag = False
-            except ValueError:
-                item_y = 0
-                y_flag = False 
-            
-            if x_flag and y_flag:
-                data[0].append(item_x)
-                data[1].append(item_y)
-        
-        return np.array(data)
+        # Keep only rows where both values are numbers
+        return data[:, ~np.isnan(data).any(axis=0)]
 
     def get_error_data(self, x:int|str, xerr:int|str, y:int|str, yerr:int|str, lenght : int|None = None) -> np.ndarray:
         """Extract data with errors for error bar plotting."""
 
-        data = [[], [], [], []]
-        
         if type(x) == str:
             x = self.get_column_index(x)
         if type(y) == str:
@@ -718,68 +925,40 @@ class ZAVLABMainWindow(QMainWindow):
             yerr = self.get_column_index(yerr)
         
         if x == -1 or y == -1:
-            return np.array(data)
+            return np.array([[], [], [], []])
         
-        if lenght == None:
-            lenght = self.table.model().rowCount() - 1
+        rows = self._plot_rows([x, y], lenght)
+        data = self.model.columns_array([x, y], rows)
         
-        for i in range(lenght + 1):
-            # Get X value
-            x_index = self.table.model().index(i, x)
-            item_x = self.table.model().data(x_index, Qt.ItemDataRole.DisplayRole)
-            x_flag = item_x is not None and item_x != ""
-            
-            # Get Y value
-            y_index = self.table.model().index(i, y)
-            item_y = self.table.model().data(y_index, Qt.ItemDataRole.DisplayRole)
-            y_flag = item_y is not None and item_y != ""
-            
-            try:
-                if x_flag:
-                    item_x = float(item_x)
-                else:
-                    x_flag = False
-            except ValueError:
-                x_flag = False
-                
-            try:
-                if y_flag:
-                    item_y = float(item_y)
-                else:
-                    y_flag = False
-            except ValueError:
-                y_flag = False 
-            
-            if x_flag and y_flag:
-                data[0].append(item_x)
-                data[2].append(item_y)
-                
-                # Get X error
-                if xerr != -1:
-                    xerr_index = self.table.model().index(i, xerr)
-                    item_xerr = self.table.model().data(xerr_index, Qt.ItemDataRole.DisplayRole)
-                    try:
-                        item_xerr = float(item_xerr) if item_xerr else 0
-                    except ValueError:
-                        item_xerr = 0
-                else:
-                    item_xerr = 0
-                
-                # Get Y error
-                if yerr != -1:
-                    yerr_index = self.table.model().index(i, yerr)
-                    item_yerr = self.table.model().data(yerr_index, Qt.ItemDataRole.DisplayRole)
-                    try:
-                        item_yerr = float(item_yerr) if item_yerr else 0
-                    except ValueError:
-                        item_yerr = 0
-                else:
-                    item_yerr = 0
-                
-                data[1].append(item_xerr)
-                data[3].append(item_yerr)     
+        # Keep only rows where both values are numbers
+        valid = ~np.isnan(data).any(axis=0)
+        x_values, y_values = data[:, valid]
         
-        return np.array(data)
+        # Missing error columns and blank error cells count as zero error
+        errors = []
+        for err in (xerr, yerr):
+            if err == -1:
+                errors.append(np.zeros(x_values.size))
+            else:
+                err_values = self.model.column_array(err, rows)[valid]
+                errors.append(np.where(np.isnan(err_values), 0.0, err_values))
+        
+        return np.array([x_values, errors[0], y_values, errors[1]])
+
+    def _plot_rows(self, cols: list[int], lenght: int | None = None) -> slice | None:
+        """
+        Rows of the table to plot.
+        When an external column is plotted, every n-th row is taken so that at most
+        PLOT_POINTS_PER_PIXEL points per pixel of the plot width are read from its file.
+        """
+
+        row_count = self.model.rowCount() if lenght is None else min(lenght + 1, self.model.rowCount())
+        if not any(self.model.is_external_column(col) for col in cols) or not hasattr(self, 'plotter'):
+            return None if lenght is None else slice(0, lenght + 1)
+        canvas = self.plotter.plot_canvas.canvas
+        limit = max(canvas.width() * canvas.devicePixelRatioF(), 1) * PLOT_POINTS_PER_PIXEL
+        step = max(int(np.ceil(row_count / limit)), 1)
+        return slice(0, row_count, step)
 
     def update_headers(self) -> None:
         """Extract headers and emit them as a list"""
@@ -924,6 +1103,8 @@ class ZAVLABMainWindow(QMainWindow):
                         <b>3. Formula Support:</b>
                         <ul>
                         <li><b>Formulas:</b> to use values from other cells use this syntaxis: [column_name]index (e.g., =[Temp_1]1+[EDS]2 * 30 + 273)</li>
+                        <li><b>Column Formulas:</b> omit the row index to calculate a whole column at once (e.g., =[A]*[B]^2 entered in any cell of the column)</li>
+                        <li><b>Ranges:</b> aggregate a block of cells with [column_name]first:[column_name]last or a whole column with [column_name] (e.g., =mean([A]1:[A]500), =stdev([A]))</li>
                         <li><b>Relative References:</b> Apply formulas with relative cell references across selections</li>
                         <li><b>Formula Bar:</b> Use the formula bar at the top to enter and edit formulas</li>
                         </ul>
@@ -931,7 +1112,10 @@ class ZAVLABMainWindow(QMainWindow):
                         <b>4. Import/Export:</b>
                         <ul>
                         <li><b>CSV Import/Export:</b> Load/save data from/to CSV files (values only, no formulas)</li>
+                        <li><b>Spreadsheet Import:</b> Load a sheet of an .xlsx workbook (first row = column names); simple Excel formulas can be imported as table formulas</li>
                         <li><b>JSON Import/Export:</b> Load/save complete table state including formulas</li>
+                        <li><b>Undo:</b> Ctrl+Z reverts the last edit (filling a selection counts as one edit), Ctrl+Y redoes it</li>
+                        <li><b>Projects:</b> Save/open the table with formulas and the plot settings in a compact binary file (*.zlab)</li>
                         <li><b>Header Preservation:</b> Column headers are preserved during import/export operations</li>
                         </ul>
                         """
@@ -1111,24 +1295,14 @@ class ZAVLABMainWindow(QMainWindow):
     def get_min_max_from_column(self, x:int|str, lenght:None|int = None)->list[float]:
         """Get minimum and maximum values from a column."""
         
-        data = []
         if type(x) == str:
             x = self.get_column_index(x)
-        if lenght == None:
-            lenght = self.table.model().rowCount() - 1
+        if x == -1:
+            return [0.0, 1.0]
         
-        for i in range(lenght + 1):
-            index = self.table.model().index(i, x)
-            item_x = self.table.model().data(index, Qt.ItemDataRole.DisplayRole)
-            
-            if item_x:
-                try:
-                    item_x = float(item_x)
-                    data.append(item_x)
-                except ValueError:
-                    pass
-        
-        data = np.array(data)
+        rows = None if lenght == None else slice(0, lenght + 1)
+        data = self.model.column_array(x, rows)
+        data = data[~np.isnan(data)]
         if data.size == 0:
             return [0.0, 1.0]
         if np.min(data) == np.max(data):
@@ -1167,11 +1341,9 @@ class ZAVLABMainWindow(QMainWindow):
             return
         
         formula = self.formula_edit.text()
-        count = 0
         
-        for index in selected_indexes:
-            if self.table.model().setData(index, formula, Qt.ItemDataRole.EditRole):
-                count += 1
+        # One edit (and one undo step) for the whole selection
+        count = self.model.set_cells([(index.row(), index.column(), formula) for index in selected_indexes])
         
         self.statusBar().showMessage(f"Formula applied to {count} cells", 3000)
 
@@ -1183,10 +1355,8 @@ class ZAVLABMainWindow(QMainWindow):
     def change_decimal_places(self, value):
         """Change decimal places setting and refresh display."""
 
-        # Update the decimal places setting
-        self.model.decimal_places = value
-        # Refresh the view to show the new formatting
-        self.model.evaluate_all()
+        # Update the decimal places setting; only the display strings are refreshed
+        self.model.set_decimal_places(value)
     
     def show_decimal_dialog(self):
         """Show dialog to set decimal places."""
@@ -1202,10 +1372,8 @@ class ZAVLABMainWindow(QMainWindow):
         )
         
         if ok:
-            self.model.decimal_places = value
+            self.model.set_decimal_places(value)
             self.decimal_spin.setValue(value)
-            # Refresh the view to show the new formatting
-            self.model.evaluate_all()
 
     def apply_formula_with_relative_refs(self):
         """Apply formula with relative references to selected cells."""
@@ -1225,49 +1393,68 @@ class ZAVLABMainWindow(QMainWindow):
             self.statusBar().showMessage("No base cell selected")
             return
         
-        count = 0
-        
-        for index in selected_indexes:
-            row_offset = index.row() - base_index.row()
-            col_offset = index.column() - base_index.column()
-            
-            # Adjust the formula for relative references
-            adjusted_formula = self.model.adjust_formula_references(base_formula, row_offset, col_offset)
-            if self.model.setData(index, adjusted_formula):
-                count += 1
+        # The references are shifted by each cell's offset from the base cell
+        count = self.model.fill_formula(base_formula, base_index.row(), base_index.column(),
+                                        [(index.row(), index.column()) for index in selected_indexes])
         
         self.statusBar().showMessage(f"Formula with relative references applied to {count} cells")
 
 
     def restore_state(self):
-        """Try to load last autosave state."""
-
-        (state, sub_state) = self.auto_save_manager.load_backup()
-        if state:
-            reply = QMessageBox.question(
-                self, 
-                "Restoring settings",
-                "Saved settings are detected. Restore them?",
-                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
-            )
-            if reply == QMessageBox.StandardButton.Yes:
+        """
+        Try to load last autosave state: the snapshot plus the edits journaled after it.
+        Without a snapshot the JSON files saved by earlier versions are restored.
+        """
+
+        (project, records) = self.auto_save_manager.load_journal()
+        if project is None:
+            (state, sub_state) = self.auto_save_manager.load_backup()
+            if state and self._ask_restore():
                 self.apply_state(state)
-                self.plotter.set_state(sub_state)
+                if sub_state:
+                    self.plotter.set_state(sub_state)
+        elif self._ask_restore():
+            try:
+                self.apply_project(project, restore_plots=False)
+                plots = project.plots
+                for record in records:
+                    if record.get("op") == "plots":
+                        plots = record["state"]
+                    else:
+                        self.model.replay(record)
+                self.update_headers()
+                
+                # Restore splitter sizes and window state
+                extra = project.extra
+                if "splitter_sizes" in extra:
+                    self.central_widget_splitter.setSizes(extra["splitter_sizes"])
+                if "window" in extra:
+                    self.restoreGeometry(bytes.fromhex(extra["window"]["geometry"]))
+                    self.restoreState(bytes.fromhex(extra["window"]["state"]))
+                if plots:
+                    self.plotter.set_state(plots)
+            except Exception as e:
+                logging.error(f"Restoring error: {str(e)}")
+        
+        # Edits are journaled from here on
+        self.auto_save_manager.start_journal()
+
+    def _ask_restore(self) -> bool:
+        """Ask if the detected autosave should be restored."""
+
+        reply = QMessageBox.question(
+            self, 
+            "Restoring settings",
+            "Saved settings are detected. Restore them?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        return reply == QMessageBox.StandardButton.Yes
     
     def closeEvent(self, event):
         """Handle application close event with autosave."""
         try:
-            # Get the complete state including formulas
-            state = self.get_state()
-            sub_state = self.plotter.get_state()  
-            
-            # Save with formulas
-            self.auto_save_manager.save_to_file(
-                sub_state, 
-                state, 
-                "./files/sub_setting_final.json",
-                "./files/settings_final.json"
-            )
+            # Compact the journal into a final snapshot
+            self.auto_save_manager.close()
         except Exception as e:
             logging.error(f"Saving error when closing: {str(e)}")
         
@@ -1280,8 +1467,11 @@ class ZAVLABMainWindow(QMainWindow):
         state = {
             "table": {
                 "decimal_places": self.model.decimal_places,
-                "column_names": self.model._column_names,
-                "formulas": self.model._formulas,
+                "column_names": list(self.model._column_names),
+                # Trailing empty rows are restored from row_count
+                "formulas": self.model.get_formulas(self.model.used_row_count()),
+                "column_formulas": {str(col): formula for col, formula in self.model.get_column_formulas().items()},
+                "external_columns": {str(col): spec for col, spec in self.model.get_external_columns().items()},
                 "row_count": self.model.rowCount(),
                 "column_count": self.model.columnCount()
             },
@@ -1305,21 +1495,11 @@ class ZAVLABMainWindow(QMainWindow):
             if "table" in state:
                 table_state = state["table"]
                 
-                # Set row and column count
-                self.model.setRowCount(table_state["row_count"])
-                self.model.setColumnCount(table_state["column_count"])
-                
-                # Restore column names
-                for col, name in enumerate(table_state["column_names"]):
-                    self.model.setHeaderData(col, Qt.Orientation.Horizontal, name)
-                
-                # Restore formulas
-                for row in range(table_state["row_count"]):
-                    for col in range(table_state["column_count"]):
-                        if row < len(table_state["formulas"]) and col < len(table_state["formulas"][row]):
-                            index = self.model.index(row, col)
-                            formula = table_state["formulas"][row][col]
-                            self.model.setData(index, formula, Qt.ItemDataRole.EditRole)
+                # Restore size, column names, formulas and whole-column formulas in one step
+                self.model.load_block(table_state["row_count"], table_state["column_count"],
+                                      table_state["formulas"], table_state["column_names"],
+                                      table_state.get("column_formulas", {}),
+                                      table_state.get("external_columns", {}))
                 
                 # Restore decimal places
                 if "decimal_places" in table_state:
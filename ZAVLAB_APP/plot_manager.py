@@ -15,7 +15,7 @@ from PyQt6.QtGui import QColor
 from interactive_plot import INTERACTIVE_PLOT
 from dialogs import SubplotPositionDialog, DataSeriesDialog
 from subplotsEditors import SubplotStyleTab, DataStyleTab, LineStyleTab, PositioningChoosingDataTab
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, pyqtSignal
 import numpy as np
 
 ##Constants
@@ -196,6 +196,8 @@ class SubplotEditor(QWidget):
     - Plot generation controls
     """
 
+    settings_changed = pyqtSignal()  # Emitted after an action that may have changed the subplot settings
+
     def __init__(self, parent=None) -> None:
         """Initialize the subplot editor with default values and UI setup."""
 
@@ -436,6 +438,14 @@ class SubplotEditor(QWidget):
         # splitter.setSizes([500, 1100])
         splitter.setStretchFactor(0, 3)
         splitter.setStretchFactor(1, 1)
+
+        # Connected last, so the handlers above have applied the change when it is emitted
+        for signal in (self.create_grid_btn.clicked, self.add_subplot_btn.clicked, self.data_btn.clicked,
+                       self.clear_btn.clicked, self.plot_btn.clicked,
+                       self.position_size_data_tab.pos_data_signal, self.data_style_tab.data_style_signal,
+                       self.subplot_style_tab.sub_style_signal, self.lines_tab.line_style_signal,
+                       self.plot_canvas.interactive_plot_signal):
+            signal.connect(lambda *_: self.settings_changed.emit())
     
     def __work_with_plot_signals__(self, sig):
         """Handle signals from the interactive plot canvas."""
@@ -0,0 +1,86 @@
+"""
+Spatial index of plotted points for hit testing on the interactive plot:
+- The points of all lines of an axes are transformed to pixel coordinates once
+  and kept in a KD-tree, so finding the point under the cursor is O(log n)
+- An index is only valid for the axes limits and size it was built with;
+  the plot drops all indexes on every draw and rebuilds them on the next lookup
+"""
+
+import numpy as np
+from scipy.spatial import cKDTree
+from matplotlib.axes import Axes
+
+
+class PointIndex:
+    """KD-tree of the pixel coordinates of the points of the lines of one axes."""
+
+    def __init__(self, ax: Axes, lines: list):
+        """
+        Args:
+            ax: Axes of the lines
+            lines: Lines whose points can be hit
+        """
+
+        self.view = ax.viewLim.frozen()
+        self.bbox = ax.bbox.frozen()
+        self.lines = []
+        self.indices = []  # index of the point in the data of its line
+        line_ids = []
+        pixels = []
+        for line in lines:
+            xdata, ydata = line.get_data()
+            xdata = np.asarray(xdata, dtype=float)
+            ydata = np.asarray(ydata, dtype=float)
+            if len(xdata) == 0:
+                continue
+            xy_pixels = line.get_transform().transform(np.column_stack([xdata, ydata]))
+            finite = np.flatnonzero(np.isfinite(xy_pixels).all(axis=1))
+            if finite.size == 0:
+                continue
+            line_ids.append(np.full(finite.size, len(self.lines)))
+            pixels.append(xy_pixels[finite])
+            self.indices.append(finite)
+            self.lines.append(line)
+        self.line_ids = np.concatenate(line_ids) if line_ids else np.empty(0, dtype=int)
+        self.indices = np.concatenate(self.indices) if self.indices else np.empty(0, dtype=int)
+        self.tree = cKDTree(np.concatenate(pixels)) if pixels else None
+
+    def is_valid(self, ax: Axes) -> bool:
+        """Check if the axes still have the limits and size the index was built with."""
+
+        return (np.array_equal(ax.viewLim.get_points(), self.view.get_points())
+                and np.array_equal(ax.bbox.get_points(), self.bbox.get_points()))
+
+    def nearest(self, x: float, y: float, radius: float, accept=None) -> tuple | None:
+        """
+        Find the point nearest to a pixel position.
+
+        Args:
+            x, y: Position in pixels
+            radius: Maximum distance in pixels
+            accept: Optional function of a line, only points of the lines it accepts are returned
+
+        Returns:
+            (line, index of the point in the line data, distance), or None if there is no point within radius
+        """
+
+        if self.tree is None:
+            return None
+        if accept is None:
+            distance, point = self.tree.query((x, y), distance_upper_bound=radius)
+            if point == self.tree.n:
+                return None
+            return self.lines[self.line_ids[point]], int(self.indices[point]), float(distance)
+
+        points = self.tree.query_ball_point((x, y), radius)
+        if not points:
+            return None
+        points = np.asarray(points)
+        accepted = np.array([accept(line) for line in self.lines], dtype=bool)
+        points = points[accepted[self.line_ids[points]]]
+        if points.size == 0:
+            return None
+        distances = np.hypot(self.tree.data[points, 0] - x, self.tree.data[points, 1] - y)
+        closest = np.argmin(distances)
+        point = points[closest]
+        return self.lines[self.line_ids[point]], int(self.indices[point]), float(distances[closest])
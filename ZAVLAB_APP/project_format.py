@@ -0,0 +1,140 @@
+"""
+Binary project files (*.zlab) holding the table and the plot settings:
+- A small JSON header with the table layout, plot settings and an index of arrays
+- Typed column arrays (float64 values and a validity mask per column)
+- One string table with every text cell and formula, referenced by index
+
+Layout: MAGIC, header length (uint64, little endian), header, then the arrays,
+each aligned to ALIGNMENT bytes. Loading reads every array with one call straight
+into a new NumPy array, so nothing is parsed cell by cell except the text cells.
+"""
+
+import json
+import os
+import struct
+import numpy as np
+
+
+MAGIC: bytes = b"ZAVLAB\x00\x01"
+FORMAT_VERSION: int = 1
+ALIGNMENT: int = 64  # Arrays start at multiples of this offset
+PROJECT_EXTENSION: str = ".zlab"
+
+
+class ProjectData:
+    """Contents of a project file."""
+
+    def __init__(self, table: dict, columns: list[tuple[np.ndarray, np.ndarray, dict]], plots, extra: dict | None = None):
+        """
+        Args:
+            table: row_count, column_count, column_names, column_formulas and decimal_places
+            columns: (values, mask, {row: text}) per column
+            plots: Plot settings as returned by SubplotEditor.get_state, or None
+            extra: Any other JSON-serializable settings (e.g. window geometry)
+        """
+
+        self.table = table
+        self.columns = columns
+        self.plots = plots
+        self.extra = extra or {}
+
+
+def _padding(size: int) -> int:
+    return -size % ALIGNMENT
+
+
+def write_project(file_name: str, table: dict, columns: list[tuple[np.ndarray, np.ndarray, dict]], plots=None,
+                  extra: dict | None = None) -> None:
+    """
+    Write a project file.
+
+    The file is written next to the target and moved into place at the end, so an
+    interrupted save never leaves a truncated project.
+
+    Args:
+        file_name: Path of the project file
+        table: Table layout, see ProjectData
+        columns: (values, mask, {row: text}) per column
+        plots: JSON-serializable plot settings
+        extra: Other JSON-serializable settings
+    """
+
+    # Every distinct text is stored once
+    strings = {}
+    arrays = []
+    for col, (values, mask, texts) in enumerate(columns):
+        rows = np.fromiter(texts.keys(), dtype=np.int64, count=len(texts))
+        ids = np.fromiter((strings.setdefault(text, len(strings)) for text in texts.values()),
+                          dtype=np.int64, count=len(texts))
+        arrays += [(f"values_{col}", np.ascontiguousarray(values, dtype='<f8')),
+                   (f"mask_{col}", np.ascontiguousarray(mask, dtype=bool)),
+                   (f"text_rows_{col}", rows),
+                   (f"text_ids_{col}", ids)]
+
+    # The string table is one UTF-8 blob with the end offset of every string
+    encoded = [text.encode('utf-8') for text in strings]
+    arrays.append(("strings", np.frombuffer(b"".join(encoded), dtype=np.uint8)))
+    arrays.append(("string_ends", np.cumsum([len(data) for data in encoded], dtype=np.int64)))
+
+    index = {}
+    offset = 0
+    for name, array in arrays:
+        index[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += array.nbytes + _padding(array.nbytes)
+
+    header = json.dumps({"version": FORMAT_VERSION, "table": table, "plots": plots, "extra": extra or {},
+                         "arrays": index}).encode('utf-8')
+    start = len(MAGIC) + 8 + len(header)
+    start += _padding(start)
+
+    temp_name = file_name + ".tmp"
+    with open(temp_name, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(header)))
+        f.write(header)
+        f.write(b"\0" * (start - f.tell()))
+        for name, array in arrays:
+            f.write(array.tobytes())
+            f.write(b"\0" * _padding(array.nbytes))
+    os.replace(temp_name, file_name)
+
+
+def read_project(file_name: str) -> ProjectData:
+    """
+    Read a project file.
+
+    The arrays are read into memory, so the file is not kept open afterwards and
+    the returned columns can be handed to the table, which modifies them in place.
+    """
+
+    with open(file_name, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError("Not a ZAVLAB project file")
+        (header_size,) = struct.unpack('<Q', f.read(8))
+        header = json.loads(f.read(header_size).decode('utf-8'))
+        if header.get("version", 0) > FORMAT_VERSION:
+            raise ValueError("The project was saved by a newer version of ZAVLAB")
+        start = len(MAGIC) + 8 + header_size
+        start += _padding(start)
+
+        def array(name):
+            entry = header["arrays"][name]
+            dtype = np.dtype(entry["dtype"])
+            count = int(np.prod(entry["shape"]))
+            f.seek(start + entry["offset"])
+            data = np.fromfile(f, dtype=dtype, count=count)
+            if len(data) != count:
+                raise ValueError("The project file is truncated")
+            return data
+
+        blob = array("strings").tobytes()
+        ends = array("string_ends").tolist()
+        strings = [blob[begin:end].decode('utf-8') for begin, end in zip([0] + ends[:-1], ends)]
+
+        columns = []
+        for col in range(header["table"]["column_count"]):
+            texts = dict(zip(array(f"text_rows_{col}").tolist(),
+                             (strings[i] for i in array(f"text_ids_{col}").tolist())))
+            columns.append((array(f"values_{col}"), array(f"mask_{col}"), texts))
+
+    return ProjectData(header["table"], columns, header.get("plots"), header.get("extra"))
@@ -0,0 +1,108 @@
+"""
+Background recalculation for the Excel-like table:
+- Evaluates dirty cells on a QThreadPool worker against a snapshot of the table
+- Streams the results back to the GUI thread in batches through signals
+- Cancels a running evaluation as soon as the table is edited again
+"""
+
+import time
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+BATCH_SIZE: int = 500  # Results sent to the GUI thread at once
+BATCH_INTERVAL: float = 0.1  # Maximum delay (seconds) before a partial batch is sent
+
+
+class RecalculationSignals(QObject):
+    """Signals of a recalculation task (QRunnable can't define signals itself)."""
+
+    batch_ready = pyqtSignal(int, list)  # generation, [(node, value)]
+    finished = pyqtSignal(int)  # generation
+
+
+class RecalculationTask(QRunnable):
+    """Evaluates a list of nodes on a snapshot of the table model."""
+
+    def __init__(self, generation: int, snapshot, nodes: list):
+        """
+        Args:
+            generation: Number of the run, sent back with every result
+            snapshot: Detached copy of the table model (see ExcelLikeModel.snapshot)
+            nodes: (row, col) cells and (None, col) column formulas to evaluate
+        """
+
+        super().__init__()
+        self.generation = generation
+        self.signals = RecalculationSignals()
+        self._snapshot = snapshot
+        self._nodes = nodes
+        self._cancelled = False
+
+    def cancel(self) -> None:
+        """Stop the evaluation before the next node."""
+
+        self._cancelled = True
+
+    def run(self) -> None:
+        batch = []
+        last_sent = time.monotonic()
+        for node in self._nodes:
+            if self._cancelled:
+                return
+            batch.append((node, self._snapshot.node_value(node)))
+            if len(batch) >= BATCH_SIZE or time.monotonic() - last_sent > BATCH_INTERVAL:
+                self.signals.batch_ready.emit(self.generation, batch)
+                batch = []
+                last_sent = time.monotonic()
+        if batch and not self._cancelled:
+            self.signals.batch_ready.emit(self.generation, batch)
+        self.signals.finished.emit(self.generation)
+
+
+class RecalculationEngine(QObject):
+    """
+    Runs recalculation tasks one at a time.
+    Every start or cancel begins a new generation; results of older generations are
+    stale and must be ignored by the receiver.
+    """
+
+    batch_ready = pyqtSignal(int, list)
+    finished = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.generation = 0
+        self._task = None
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)  # A cancelled run finishes before the next one starts
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self, snapshot, nodes: list) -> None:
+        """Cancel the current run and evaluate the nodes on the snapshot in the background."""
+
+        self.cancel()
+        self._task = RecalculationTask(self.generation, snapshot, nodes)
+        self._task.signals.batch_ready.connect(self.batch_ready)
+        self._task.signals.finished.connect(self._task_finished)
+        self._pool.start(self._task)
+
+    def cancel(self) -> None:
+        """Stop the current run; its pending results become stale."""
+
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self.generation += 1
+
+    def _task_finished(self, generation: int) -> None:
+        if generation == self.generation:
+            self._task = None
+            self.finished.emit(generation)
+
+    def wait(self) -> None:
+        """Block until the worker thread is idle."""
+
+        self._pool.waitForDone()
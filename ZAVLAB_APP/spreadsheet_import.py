@@ -0,0 +1,271 @@
+"""
+Spreadsheet import (.xlsx) for the Excel-like table:
+- Streams the rows of an .xlsx sheet with openpyxl in read-only mode on a QThreadPool
+  worker, converting them to columnar data in chunks (see csv_import.convert_chunk),
+  so only one chunk of cells is held as Python objects at a time
+- Takes the column names from the first row, like the CSV import
+- Optionally translates simple Excel formulas (e.g. =A2*2+SUM(B2:B10)) to the
+  table syntax ([A]1*2+sum([B]1:[B]9)); other formulas keep their calculated value
+"""
+
+import datetime
+import re
+import zipfile
+import xml.etree.ElementTree as ElementTree
+import numpy as np
+import pandas as pd
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+from csv_import import CsvTable, convert_chunk
+from table import ExcelLikeModel
+
+
+SPREADSHEET_EXTENSIONS: tuple[str, ...] = ('.xlsx', '.xlsm')
+CHUNK_ROWS: int = 10_000  # Rows converted at once; cells are Python objects until then
+
+# Excel functions with a counterpart in the table formulas
+EXCEL_FUNCTIONS: dict = {
+    'SUM': 'sum',
+    'AVERAGE': 'mean',
+    'MEDIAN': 'median',
+    'STDEV': 'stdev',
+    'STDEV.S': 'stdev',
+    'MIN': 'min',
+    'MAX': 'max',
+    'COUNT': 'len',
+    'ABS': 'abs',
+    'ROUND': 'round',
+    'SQRT': 'sqrt',
+    'SIN': 'sin',
+    'COS': 'cos',
+    'TAN': 'tan',
+    'LN': 'log',
+    'LOG10': 'log10',
+    'EXP': 'exp',
+}
+EXCEL_CELL_PATTERN: str = r'\$?([A-Z]{1,3})\$?(\d+)'
+EXCEL_RANGE_PATTERN: str = EXCEL_CELL_PATTERN + ':' + EXCEL_CELL_PATTERN
+NAME_PATTERN: str = r'^[A-Za-z_][A-Za-z0-9_]*$'  # Column names usable in table formulas
+
+
+def column_letter_index(letters: str) -> int:
+    """Convert an Excel column name (A, B, ..., AA, ...) to a zero-based index."""
+
+    index = 0
+    for char in letters:
+        index = index * 26 + ord(char) - ord('A') + 1
+    return index - 1
+
+
+def translate_formula(formula: str, headers: list[str], header_rows: int = 1) -> str | None:
+    """
+    Translate a simple Excel formula into the table syntax.
+
+    Args:
+        formula: Excel formula starting with '='
+        headers: Table column names, by sheet column
+        header_rows: Sheet rows above the first table row
+
+    Returns:
+        The table formula, or None if the formula uses anything without a counterpart
+        (other sheets, text, unknown functions, references to the header row)
+    """
+
+    if not formula.startswith('=') or any(char in formula for char in '"!&%<>{}#'):
+        return None
+
+    def reference(letters: str, row: str) -> str:
+        col = column_letter_index(letters)
+        table_row = int(row) - header_rows
+        if col >= len(headers) or table_row < 1 or not re.match(NAME_PATTERN, headers[col]):
+            raise ValueError(f"{letters}{row} can't be translated")
+        return f"[{headers[col]}]{table_row}"
+
+    def function(match):
+        name = match.group(1).upper()
+        if name not in EXCEL_FUNCTIONS:
+            raise ValueError(f"Unsupported function: {name}")
+        return EXCEL_FUNCTIONS[name] + '('
+
+    def cell_range(match):
+        if match.group(1) != match.group(3):
+            raise ValueError("A range must stay within one column")
+        return f"{reference(match.group(1), match.group(2))}:{reference(match.group(3), match.group(4))}"
+
+    try:
+        expression = formula[1:]
+        expression = re.sub(r'\bPI\(\)', 'pi', expression)
+        expression = re.sub(r'\b([A-Za-z][A-Za-z0-9.]*)\(', function, expression)
+        expression = re.sub(EXCEL_RANGE_PATTERN, cell_range, expression)
+        # Names of translated references can't be taken for Excel references
+        expression = re.sub(r'(?<![\[A-Za-z0-9_])' + EXCEL_CELL_PATTERN + r'(?![\]A-Za-z0-9_(])',
+                            lambda match: reference(match.group(1), match.group(2)), expression)
+    except ValueError:
+        return None
+
+    # Anything left besides references, functions, numbers and operators has no counterpart
+    rest = re.sub(r'\[[A-Za-z_][A-Za-z0-9_]*\]\d+', '', expression)
+    rest = re.sub(r'\b(' + '|'.join(set(EXCEL_FUNCTIONS.values())) + r')\(', '(', rest)
+    rest = re.sub(r'\bpi\b', '', rest)
+    if not re.match(r'^[0-9.eE+\-*/^(),: ]*$', rest):
+        return None
+    return '=' + expression
+
+
+def sheet_names(file_name: str) -> list[str]:
+    """Return the sheet names of an .xlsx workbook without loading it."""
+
+    with zipfile.ZipFile(file_name) as archive:
+        root = ElementTree.fromstring(archive.read('xl/workbook.xml'))
+    return [sheet.get('name') for sheet in root.iter() if sheet.tag.endswith('}sheet')]
+
+
+def _cell_text(value):
+    """Value of a sheet cell as taken by convert_chunk: numbers stay numbers, the rest becomes text."""
+
+    if value is None or isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    return str(value)
+
+
+def _xlsx_rows(file_name: str, sheet: str | None, formulas: bool):
+    """
+    Yield (total row count or None, rows) for an .xlsx sheet, read in streaming mode.
+    With formulas=True every row is a list of (value, formula or None) pairs.
+    """
+
+    from openpyxl import load_workbook
+
+    values_book = load_workbook(file_name, read_only=True, data_only=True)
+    books = [values_book]
+    try:
+        values_sheet = values_book[sheet] if sheet else values_book.worksheets[0]
+        rows = values_sheet.iter_rows(values_only=True)
+        if formulas:
+            # The formulas and their calculated values are stored in two different views of the file
+            formula_book = load_workbook(file_name, read_only=True, data_only=False)
+            books.append(formula_book)
+            formula_sheet = formula_book[values_sheet.title]
+            rows = (list(zip(values, formula_row))
+                    for values, formula_row in zip(rows, formula_sheet.iter_rows(values_only=True)))
+        yield values_sheet.max_row, rows
+    finally:
+        for book in books:
+            book.close()
+
+
+def read_spreadsheet(file_name: str, sheet: str | None = None, translate_formulas: bool = False,
+                     progress=None, cancelled=None) -> CsvTable | None:
+    """
+    Read a sheet with the column names in its first row.
+
+    Args:
+        file_name: .xlsx/.xlsm workbook
+        sheet: Sheet name; the first sheet by default
+        translate_formulas: Import simple formulas of an .xlsx file as table formulas
+        progress: Optional callable taking the percentage of rows read so far
+        cancelled: Optional callable returning True when the import must stop
+
+    Returns:
+        Parsed table, or None if the import was cancelled
+    """
+
+    for total, rows in _xlsx_rows(file_name, sheet, translate_formulas):
+        header = next(rows, None)
+        if translate_formulas and header is not None:
+            header = [value for value, _ in header]
+        header = list(header or [])
+        if all(name is None for name in header):
+            raise ValueError("The sheet has no header row")
+        # Unnamed columns keep the sheet's column letter
+        headers = [str(name) if name is not None else ExcelLikeModel.index_to_column_name(col) for col, name in enumerate(header)]
+        width = len(headers)
+
+        chunks = [[] for _ in headers]
+        block = []
+        row_count = 0
+        used = 0  # Rows up to the last one with content; formatted blank rows at the end are dropped
+
+        def flush():
+            nonlocal block, row_count, used
+            columns = list(zip(*block)) if block else [()] * width
+            for col in range(width):
+                values, mask, texts = convert_chunk(pd.Series(columns[col], dtype=object), row_count)
+                filled = np.flatnonzero(mask)
+                if len(filled):
+                    used = max(used, row_count + int(filled[-1]) + 1)
+                if texts:
+                    used = max(used, max(texts) + 1)
+                chunks[col].append((values, mask, texts))
+            row_count += len(block)
+            block = []
+
+        for row in rows:
+            cells = []
+            for col in range(width):
+                cell = row[col] if col < len(row) else ((None, None) if translate_formulas else None)
+                if translate_formulas:
+                    value, formula = cell
+                    table_formula = translate_formula(formula, headers) if isinstance(formula, str) else None
+                    cell = table_formula if table_formula is not None else value
+                cells.append(_cell_text(cell))
+            block.append(cells)
+            if len(block) >= CHUNK_ROWS:
+                if cancelled is not None and cancelled():
+                    return None
+                flush()
+                if progress is not None and total:
+                    progress(min(100, int(100 * row_count / total)))
+        flush()
+
+    table_columns = []
+    for parts in chunks:
+        texts = {}
+        for _, _, part_texts in parts:
+            texts.update((row, text) for row, text in part_texts.items() if row < used)
+        table_columns.append((np.concatenate([values for values, _, _ in parts])[:used],
+                              np.concatenate([mask for _, mask, _ in parts])[:used], texts))
+    # Columns at the end without a name are only dropped when they hold no data either
+    while len(table_columns) > 1 and header[len(table_columns) - 1] is None:
+        _, mask, texts = table_columns[-1]
+        if mask.any() or texts:
+            break
+        table_columns.pop()
+    return CsvTable(headers[:len(table_columns)], used, table_columns)
+
+
+class SpreadsheetImportSignals(QObject):
+    """Signals of a spreadsheet import task."""
+
+    progress = pyqtSignal(int)  # Percentage of the rows read
+    finished = pyqtSignal(object)  # CsvTable, or None if cancelled
+    failed = pyqtSignal(str)  # Error message
+
+
+class SpreadsheetImportTask(QRunnable):
+    """Reads a spreadsheet on a worker thread."""
+
+    def __init__(self, file_name: str, sheet: str | None = None, translate_formulas: bool = False):
+        super().__init__()
+        self.file_name = file_name
+        self.sheet = sheet
+        self.translate_formulas = translate_formulas
+        self.signals = SpreadsheetImportSignals()
+        self._cancelled = False
+
+    def cancel(self) -> None:
+        """Stop the import before the next chunk."""
+
+        self._cancelled = True
+
+    def run(self) -> None:
+        try:
+            table = read_spreadsheet(self.file_name, self.sheet, self.translate_formulas,
+                                     self.signals.progress.emit, lambda: self._cancelled)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit(None if self._cancelled else table)
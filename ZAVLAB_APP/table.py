@@ -1,5 +1,6 @@
 import sys
 import re
+import logging
 import ast
 import operator as op
 from PyQt6 import QtCore, QtGui, QtWidgets
@@ -7,20 +8,72 @@ from PyQt6.QtCore import Qt
 import math
 import statistics
 import random
+import numpy as np
 from PyQt6.QtCore import pyqtSignal
+from formula_engine import FormulaCompiler, FormulaTemplate
+from table_storage import ListStore, ColumnarStore
+from recalculation import RecalculationEngine
+from external_data import ExternalColumn
+from table_history import UndoStack, UNDO_COMMAND_LIMIT
+
+CYCLE_VALUE: str = "#CYCLE!"  # Value shown in cells that are part of a circular reference
+CALCULATING_VALUE: str = "calculating…"  # Shown in cells waiting for the background recalculation
+BACKGROUND_THRESHOLD: int = 2000  # Edits affecting at least this many cells are recalculated in the background
+
 
 class ExcelLikeModel(QtCore.QAbstractTableModel):
     """Excel-like table model with formula support and relative references."""
     
-    def __init__(self, rows=20, cols=10):
-        """Initialize the table model with data, formulas, and dependencies."""
+    # Journal record of every edit of the table contents, replayable with replay()
+    edited = pyqtSignal(dict)
+    
+    def __init__(self, rows=20, cols=10, columnar=False):
+        """Initialize the table model with data, formulas, and dependencies.
+        
+        With columnar=True numbers are kept in per-column float64 arrays and
+        text/formulas in a sparse store (see table_storage.ColumnarStore)."""
         super().__init__()
-        self._data = [['' for _ in range(cols)] for _ in range(rows)]
-        self._formulas = [['' for _ in range(cols)] for _ in range(rows)]
+        self._store = ColumnarStore(rows, cols) if columnar else ListStore(rows, cols)
         self._dependencies = {}  # Track cell dependencies: {source: [dependents]}
+        self._precedents = {}  # Reverse dependencies: {dependent: [sources]}
+        self._values = {}  # Cached evaluated cell values: {(row, col): value}
+        self._graph_dirty = False  # Dependencies must be rebuilt after structural changes
+        
+        # Whole-column formulas (e.g. =[A]*[B]^2) evaluated once with NumPy.
+        # In the dependency graph a column formula is the node (None, col).
+        self._column_formulas = {}  # {col: formula}
+        self._column_values = {}  # Cached results: {col: float64 array or error string}
+        self._column_dependents = {}  # {source col: [column formula cols]}
+        
+        # Ranges (e.g. [A]1:[A]500, or [A] inside an aggregate) as (col, first row, last row),
+        # last row None for the whole column
+        self._range_dependents = {}  # {col: {(first, last, dependent)}}
+        self._range_precedents = {}  # {dependent: [(col, first, last)]}
+        self._range_values = {}  # Cached range arrays: {col: {(first, last): array}}
+        
+        # Read-only columns served from memory-mapped files (see external_data)
+        self._external_columns = {}  # {col: ExternalColumn}
+        
+        # Undo/redo history of the edits, kept as deltas (see table_history)
+        self._history = UndoStack()
+        self._undoing = False  # Edits made by undo/redo aren't recorded
+        
+        # Display cache: formatted text and number flag of evaluated cells for the
+        # current decimal places: {col: {row: (text, is_number)}}
+        self._display = {}
+        self._display_places = None
+        # Visible (top, left, bottom, right) cells of the view; None evaluates everything eagerly
+        self._visible = None
+        
+        # Optional background recalculation (see set_background_recalculation)
+        self._engine = None
+        self._pending = set()  # Nodes waiting for a value from the background engine
+        self._background_threshold = BACKGROUND_THRESHOLD
+        self._restart_scheduled = False
         
         # Initialize custom column names (default to Excel-style: A, B, C, ...)
         self._column_names = [self.index_to_column_name(i) for i in range(cols)]
+        self._update_column_index()
         self.last_columnn_name = cols
         # Decimal places setting (default to 2)
         self.decimal_places = 2
@@ -71,16 +124,46 @@ class ExcelLikeModel(QtCore.QAbstractTableModel):
             'str': str
         }
         self.cell_patern = r'(\[([A-Za-z_][A-Za-z0-9_]*)\])(\d+)'
+        # Formulas are compiled once and shared between cells with the same text
+        self._compiler = FormulaCompiler(self._safe_operators, self._safe_functions,
+                                         self.column_name_to_index, self.cell_patern)
 
     def rowCount(self, parent=None):
         """Return number of rows in the model."""
         
-        return len(self._data)
+        return self._store.row_count
 
     def columnCount(self, parent=None):
         """Return number of columns in the model."""
         
-        return len(self._data[0])
+        return self._store.column_count
+
+    def get_formulas(self, rows=None):
+        """Return the raw contents (values and formulas) of all cells, or of the first rows, as a list of rows."""
+
+        return self._store.to_matrix(rows)
+
+    def used_row_count(self):
+        """Return the number of rows up to the last one with stored content.
+        
+        Rows past it are empty or only filled by column formulas and external data."""
+
+        return self._store.used_row_count()
+
+    def numeric_column(self, col):
+        """Return (values, mask) of the literal numbers stored in the column."""
+
+        return self._store.numeric_column(col)
+
+    def column_data(self, col):
+        """Return (values, mask, {row: text}) of the raw column contents, as taken by load_columns."""
+
+        return self._store.column_data(col)
+
+    def get_column_formulas(self):
+        """Return the whole-column formulas as {col: formula}."""
+
+        return dict(self._column_formulas)
     
     def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
         """Return header data for the given section and orientation."""        
@@ -103,9 +186,15 @@ class ExcelLikeModel(QtCore.QAbstractTableModel):
         if (orientation == Qt.Orientation.Horizontal and 
             role == Qt.ItemDataRole.EditRole and 
             0 <= section < len(self._column_names)):
+            if value != self._column_names[section]:
+                self._record(("rename", section, self._column_names[section], value))
             # Update the column name
             self._column_names[section] = value
+            self._update_column_index()
+            self.invalidate_structure()
             self.headerDataChanged.emit(orientation, section, section)
+            self.evaluate_all()
+            self.edited.emit({"op": "rename", "col": section, "name": value})
             return True
         return False
 
@@ -114,6 +203,9 @@ class ExcelLikeModel(QtCore.QAbstractTableModel):
         
         if not index.isValid():
             return Qt.ItemFlag.ItemIsEnabled
+        if index.column() in self._external_columns:
+            # External data columns are read-only
+            return super().flags(index) | Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEnabled
         
         # Make cells editable
         return super().flags(index) | Qt.ItemFlag.ItemIsEditable | Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEnabled
@@ -125,184 +217,896 @@ class ExcelLikeModel(QtCore.QAbstractTableModel):
             return None
             
         if role == Qt.ItemDataRole.DisplayRole:
-            # Evaluate the cell for display
-            result = self.evaluate_cell(index.row(), index.column())
-            
-            # Format numbers with the specified decimal places
-            try:
-                # Try to convert to float and format
-                num_value = float(result)
-                return f"{num_value:.{self.decimal_places}f}"
-            except (ValueError, TypeError):
-                # If it's not a number, return as is
-                return str(result)
+            if self._is_pending(index.row(), index.column()):
+                return CALCULATING_VALUE
+            return self.display_value(index.row(), index.column())[0]
                 
         elif role == Qt.ItemDataRole.EditRole:
             # Return the formula for editing
-            return self._formulas[index.row()][index.column()]
+            if index.column() in self._column_formulas:
+                return self._column_formulas[index.column()]
+            if index.column() in self._external_columns:
+                return str(self.cell_value(index.row(), index.column()))
+            return self._store.get(index.row(), index.column())
         elif role == Qt.ItemDataRole.TextAlignmentRole:
             # Right-align numbers, left-align text
-            try:
-                float(self.evaluate_cell(index.row(), index.column()))
+            if not self._is_pending(index.row(), index.column()) and self.display_value(index.row(), index.column())[1]:
                 return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
-            except (ValueError, TypeError):
-                return Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter
+            return Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter
         return None
 
+    def display_value(self, row, col):
+        """Return (text, is_number) shown for the cell, formatting it only once per value."""
+
+        if self._display_places != self.decimal_places:
+            # The formatted strings are only valid for the decimal places they were made with
+            self._display.clear()
+            self._display_places = self.decimal_places
+        column = self._display.get(col)
+        if column is None:
+            column = self._display[col] = {}
+        entry = column.get(row)
+        if entry is None:
+            result = self.cell_value(row, col)
+            # Format numbers with the specified decimal places
+            try:
+                entry = (f"{float(result):.{self.decimal_places}f}", True)
+            except (ValueError, TypeError):
+                # If it's not a number, show it as is
+                entry = (str(result), False)
+            column[row] = entry
+        return entry
+
+    def set_decimal_places(self, places):
+        """Change the number of decimal places shown; values are not recalculated."""
+
+        self.decimal_places = places
+        self._display.clear()
+        self._display_places = places
+        if self.rowCount() and self.columnCount():
+            self.dataChanged.emit(self.index(0, 0), self.index(self.rowCount() - 1, self.columnCount() - 1),
+                                  [Qt.ItemDataRole.DisplayRole])
+        self.edited.emit({"op": "decimal_places", "value": places})
+
+    def set_visible_range(self, top, left, bottom, right):
+        """Tell the model which cells the view shows; only those are evaluated eagerly."""
+
+        self._visible = (top, left, bottom, right)
+
+    def _is_visible(self, node):
+        """Check if a cell, or any cell of a column formula node, is in the visible range."""
+
+        if self._visible is None:
+            return True
+        top, left, bottom, right = self._visible
+        row, col = node
+        return left <= col <= right and (row is None or top <= row <= bottom)
+
     def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
         """Set data at index to value for the given role."""
 
         if role == Qt.ItemDataRole.EditRole:
             row, col = index.row(), index.column()
+            if col in self._external_columns:
+                return False
+            self.edited.emit({"op": "set", "row": row, "col": col, "value": value})
+            # Formulas referencing whole columns define the entire column
+            if value.startswith('=') and self._compiler.compile(value).is_column_formula:
+                return self.set_column_formula(col, value)
+            
+            if self._graph_dirty:
+                self.rebuild_dependencies()
+            changed = []
+            old = self._store.get(row, col)
+            self.begin_macro()
+            if col in self._column_formulas:
+                # Typing into a calculated column turns it back into plain cells
+                self._record(("column", col, self._column_formulas[col], None, None))
+                changed += self.remove_column_formula(col)
+            if value != old:
+                self._record(("set", row, col, old, value))
+            self.end_macro()
             
             # Clear previous dependencies for this cell
             self.clear_dependencies(row, col)
             
             # Set the formula
-            self._formulas[row][col] = value
+            self._store.set(row, col, value)
             
             # If it's a formula, parse and set up dependencies
-            if value.startswith('='):
-                try:
-                    # Find all cell references in the formula
-                    pattern = self.cell_patern
-                    matches = re.findall(pattern, value)
-                    for col_ref, row_ref in matches:
-                        # Find column index by name
-                        col_idx = self.column_name_to_index(col_ref)
-                        ref_row_idx = int(row_ref) - 1
-                        
-                        # Add dependency tracking
-                        ref_key = (ref_row_idx, col_idx)
-                        if ref_key not in self._dependencies:
-                            self._dependencies[ref_key] = []
-                        if (row, col) not in self._dependencies[ref_key]:
-                            self._dependencies[ref_key].append((row, col))
-                except:
-                    pass
+            self._register_dependencies(row, col, value)
             
-            # Recalculate all formulas
-            self.evaluate_all()
+            # Recalculate the edited cell and everything that depends on it
+            changed += self._recalculate(row, col)
             
-            # Notify the view that data has changed
-            self.dataChanged.emit(
-                self.index(0, 0),
-                self.index(self.rowCount() - 1, self.columnCount() - 1)
-            )
+            # Notify the view about the changed cells only
+            self.emit_changed_cells(changed)
             return True
         return False
 
+    def set_cells(self, cells):
+        """Set many cells as one edit (e.g. filling a selection).
+        
+        The dependency graph is updated for all cells first, then the cells and their
+        dependents are recalculated once in a single order instead of after every
+        cell. The edit is one undo step and one "set_many" journal record.
+        
+        Args:
+            cells: (row, col, value) triples
+        
+        Returns:
+            Number of cells set
+        """
+
+        if self._graph_dirty:
+            self.rebuild_dependencies()
+        changed = []
+        edited = []
+        journaled = []  # [row, col, value] of the cells not journaled yet
+        count = 0
+        self.begin_macro()
+        for row, col, value in cells:
+            if col in self._external_columns:
+                continue
+            count += 1
+            if value.startswith('=') and self._compiler.compile(value).is_column_formula:
+                # Replaces the whole column, so it is journaled after the cells set before it
+                if journaled:
+                    self.edited.emit({"op": "set_many", "cells": journaled})
+                    journaled = []
+                self.setData(self.index(row, col), value)
+                continue
+            journaled.append([row, col, value])
+            if col in self._column_formulas:
+                self._record(("column", col, self._column_formulas[col], None, None))
+                changed += self.remove_column_formula(col)
+            old = self._store.get(row, col)
+            if value != old:
+                self._record(("set", row, col, old, value))
+            self.clear_dependencies(row, col)
+            self._store.set(row, col, value)
+            self._register_dependencies(row, col, value)
+            edited.append((row, col))
+        self.end_macro()
+        if journaled:
+            self.edited.emit({"op": "set_many", "cells": journaled})
+        
+        changed += self._recalculate_nodes(edited)
+        self.emit_changed_cells(changed)
+        return count
+
+    def fill_formula(self, formula, base_row, base_col, cells):
+        """Copy a formula with relative references into many cells as one edit.
+        
+        The formula is split into a template once (see FormulaTemplate) and the copies
+        are set with set_cells. If the cells are a whole column and every copy only
+        refers to its own row, the column gets the equivalent column formula instead,
+        which is evaluated with NumPy in one pass.
+        
+        Args:
+            formula: Formula as written for the base cell
+            base_row, base_col: Cell the formula was written for
+            cells: (row, col) pairs to fill
+        
+        Returns:
+            Number of cells set
+        """
+
+        cells = list(cells)
+        template = FormulaTemplate(formula, self.column_name_to_index, self.cell_patern)
+        columns = {col for _, col in cells}
+        if len(columns) == 1 and len({row for row, _ in cells}) == self.rowCount() == len(cells):
+            col = columns.pop()
+            column_formula = template.column_formula(base_row, col - base_col, self._column_names)
+            if column_formula is not None and col not in self._external_columns:
+                compiled = self._compiler.compile(column_formula)
+                if compiled.error is None and compiled.is_column_formula and not compiled.ranges:
+                    self.setData(self.index(0, col), column_formula)
+                    return len(cells)
+        
+        # The copies share the compiled original instead of being parsed one by one
+        base = self._compiler.compile(formula) if formula.startswith('=') else None
+        rows, cols = self.rowCount(), self.columnCount()
+        values = []
+        for row, col in cells:
+            text = template.instantiate(row - base_row, col - base_col, self._column_names, rows)
+            if base is not None and template.fits(row - base_row, col - base_col, cols, rows):
+                self._compiler.compile_shifted(text, base, row - base_row, col - base_col)
+            values.append((row, col, text))
+        return self.set_cells(values)
+
+    def set_column_formula(self, col, formula):
+        """Make the column a calculated column defined by a whole-column formula."""
+
+        if self._graph_dirty:
+            self.rebuild_dependencies()
+        if not self._undoing:
+            self._record(("column", col, self._column_formulas.get(col),
+                          None if col in self._column_formulas else self._column_contents(col), formula))
+        if col in self._column_formulas:
+            self._clear_column_formula_dependencies(col)
+        
+        # The formula replaces every cell of the column
+        for row in self._store.formula_rows(col):
+            self.clear_dependencies(row, col)
+        self._store.clear_column(col)
+        for row in range(self.rowCount()):
+            self._values.pop((row, col), None)
+        
+        self._column_formulas[col] = formula
+        self._register_column_dependencies(col, formula)
+        self.emit_changed_cells(self._recalculate(None, col))
+        return True
+
+    def remove_column_formula(self, col):
+        """Turn a calculated column back into plain (empty) cells."""
+
+        self._clear_column_formula_dependencies(col)
+        del self._column_formulas[col]
+        self._column_values.pop(col, None)
+        return self.recalculate_dependents(None, col)
+
+    def _column_contents(self, col):
+        """Return a copy of column_data(col) for the undo history, or None if the column is empty."""
+
+        values, mask, texts = self._store.column_data(col)
+        if not (texts or mask.any()):
+            return None
+        return values.copy(), mask.copy(), texts
+
+    def _restore_column(self, col, data):
+        """Put back the cells of a column saved by _column_contents, replacing its column formula."""
+
+        if self._graph_dirty:
+            self.rebuild_dependencies()
+        changed = []
+        if col in self._column_formulas:
+            changed += self.remove_column_formula(col)
+        for row in self._store.formula_rows(col):
+            self.clear_dependencies(row, col)
+        if data is None:
+            self._store.clear_column(col)
+        else:
+            values, mask, texts = data
+            # The history keeps its copy, the column may be undone again
+            self._store.set_column(col, values.copy(), mask.copy(), dict(texts))
+        for row in self._store.formula_rows(col):
+            self._register_dependencies(row, col, self._store.get(row, col))
+        for key in [key for key in self._values if key[1] == col]:
+            del self._values[key]
+        
+        # Every cell of the column may have changed, as after a new column formula
+        changed += self._recalculate(None, col)
+        self.emit_changed_cells(changed)
+        # A whole column can't be described by single edits
+        self.edited.emit({"op": "reset"})
+
+    def _register_dependencies(self, row, col, formula):
+        """Add dependency edges from every cell referenced in the formula to (row, col)."""
+
+        if not formula.startswith('='):
+            return
+        # Compiling here warms the cache and gives the resolved references
+        compiled = self._compiler.compile(formula)
+        for ref_key in compiled.references:
+            self._add_dependency(ref_key, (row, col))
+        for source, first, last in compiled.ranges:
+            self._add_range_dependency(source, first, last, (row, col))
+
+    def _register_column_dependencies(self, col, formula):
+        """Add dependency edges for the column formula of the given column."""
+
+        compiled = self._compiler.compile(formula)
+        for ref_key in compiled.references:
+            self._add_dependency(ref_key, (None, col))
+        for source in compiled.columns:
+            dependents = self._column_dependents.setdefault(source, [])
+            if col not in dependents:
+                dependents.append(col)
+        for source, first, last in compiled.ranges:
+            self._add_range_dependency(source, first, last, (None, col))
+
+    def _clear_column_formula_dependencies(self, col):
+        """Remove the dependency edges of the column formula of the given column."""
+
+        self.clear_dependencies(None, col)
+        for source in list(self._column_dependents):
+            if col in self._column_dependents[source]:
+                self._column_dependents[source].remove(col)
+                if not self._column_dependents[source]:
+                    del self._column_dependents[source]
+
+    def _add_dependency(self, source, dependent):
+        """Record that dependent must be recalculated when source changes."""
+
+        if source not in self._dependencies:
+            self._dependencies[source] = []
+        if dependent not in self._dependencies[source]:
+            self._dependencies[source].append(dependent)
+            self._precedents.setdefault(dependent, []).append(source)
+
+    def _add_range_dependency(self, col, first, last, dependent):
+        """Record that dependent must be recalculated when a cell of the range changes."""
+
+        self._range_dependents.setdefault(col, set()).add((first, last, dependent))
+        self._range_precedents.setdefault(dependent, []).append((col, first, last))
+
+    def rebuild_dependencies(self):
+        """Rebuild the whole dependency graph from the stored formulas."""
+
+        self._dependencies = {}
+        self._precedents = {}
+        self._column_dependents = {}
+        self._range_dependents = {}
+        self._range_precedents = {}
+        for row, col, formula in self._store.formula_cells():
+            self._register_dependencies(row, col, formula)
+        for col, formula in self._column_formulas.items():
+            self._register_column_dependencies(col, formula)
+        self._graph_dirty = False
+
+    def invalidate_structure(self):
+        """Drop cached values and mark the dependency graph as stale.
+        
+        References are stored by row number and column name, so inserting, removing
+        or renaming rows and columns can change what any formula points to."""
+
+        self._values.clear()
+        self._column_values.clear()
+        self._range_values.clear()
+        self._display.clear()
+        self._compiler.clear()
+        self._cancel_background()
+        self._graph_dirty = True
+
+    def _dependents_of(self, node):
+        """Return the nodes that directly depend on a cell or column formula node."""
+
+        row, col = node
+        dependents = list(self._dependencies.get(node, ()))
+        # Column formulas depend on every cell of the columns they reference
+        dependents.extend((None, dependent) for dependent in self._column_dependents.get(col, ()))
+        for first, last, dependent in self._range_dependents.get(col, ()):
+            if row is None or (first <= row and (last is None or row <= last)):
+                dependents.append(dependent)
+        if row is None:
+            # A recalculated column changes all of its cells
+            for (source_row, source_col), cells in self._dependencies.items():
+                if source_col == col and source_row is not None:
+                    dependents.extend(cells)
+        return dependents
+
+    def dependents_in_order(self, row, col):
+        """Return the cell and all of its transitive dependents in topological order.
+        
+        row=None stands for the column formula of the column."""
+
+        return self._nodes_in_order([(row, col)])
+
+    def _nodes_in_order(self, nodes):
+        """Return the nodes and all of their transitive dependents in one topological order."""
+
+        order = []
+        visited = set()
+        for node in nodes:
+            if node in visited:
+                continue
+            visited.add(node)
+            # Iterative depth-first search; each stack entry keeps an iterator over dependents
+            stack = [(node, iter(self._dependents_of(node)))]
+            while stack:
+                cell, children = stack[-1]
+                for child in children:
+                    if child not in visited:
+                        visited.add(child)
+                        stack.append((child, iter(self._dependents_of(child))))
+                        break
+                else:
+                    stack.pop()
+                    order.append(cell)
+        order.reverse()
+        return order
+
+    def recalculate_dependents(self, row, col):
+        """Invalidate and recompute the cell and its transitive dependents."""
+
+        order = self.dependents_in_order(row, col)
+        self._invalidate_nodes(order)
+        self._evaluate_visible(order)
+        return order
+
+    def _invalidate_nodes(self, nodes):
+        """Drop the cached values of the nodes and of the ranges containing them."""
+
+        for cell in nodes:
+            if cell[0] is None:
+                self._column_values.pop(cell[1], None)
+                self._display.pop(cell[1], None)
+            else:
+                self._values.pop(cell, None)
+                self._display.get(cell[1], {}).pop(cell[0], None)
+            self._invalidate_ranges(*cell)
+
+    def _evaluate_visible(self, nodes):
+        """Evaluate the nodes shown by the view; the others are evaluated when needed."""
+
+        for cell in nodes:
+            if self._is_visible(cell):
+                self.node_value(cell)
+
+    def node_value(self, node):
+        """Return the value of a cell, or the result of the column formula for (None, col)."""
+
+        row, col = node
+        if row is None:
+            return self.column_vector(col) if col in self._column_formulas else None
+        return self.cell_value(row, col)
+
+    def _recalculate(self, row, col):
+        """Recalculate the node and its dependents, in the background if the update is large.
+        
+        While a background run is pending every edit joins it, so results computed
+        from older inputs are never shown."""
+
+        return self._recalculate_nodes([(row, col)])
+
+    def _recalculate_nodes(self, nodes):
+        """Recalculate several nodes and their dependents as one update (see _recalculate)."""
+
+        order = self._nodes_in_order(nodes)
+        self._invalidate_nodes(order)
+        if self._engine is None:
+            self._evaluate_visible(order)
+            return order
+        if len(order) < self._background_threshold and not self._pending:
+            self._evaluate_visible(order)
+        else:
+            self._pending.update(order)
+            self._schedule_background()
+        return order
+
+    def set_background_recalculation(self, enabled, threshold=BACKGROUND_THRESHOLD):
+        """Evaluate large updates on a worker thread instead of the GUI thread.
+        
+        Args:
+            enabled: Turn the background engine on or off
+            threshold: Minimum number of affected cells for an edit to go to the background
+        """
+
+        self._background_threshold = threshold
+        if enabled and self._engine is None:
+            self._engine = RecalculationEngine(self)
+            self._engine.batch_ready.connect(self._apply_background_results)
+            self._engine.finished.connect(self._background_finished)
+        elif not enabled and self._engine is not None:
+            self._cancel_background()
+            self._engine = None
+
+    def snapshot(self):
+        """Return a detached copy of the table used to evaluate formulas off the GUI thread.
+        
+        Nothing mutable is shared with the model; cached values are carried over, so
+        only the invalidated nodes are evaluated again."""
+
+        snapshot = ExcelLikeModel(0, 0)
+        snapshot._store = self._store.copy()
+        snapshot._column_names = list(self._column_names)
+        snapshot._update_column_index()
+        snapshot._column_formulas = dict(self._column_formulas)
+        snapshot._external_columns = dict(self._external_columns)  # Read-only, safe to share
+        snapshot._values = dict(self._values)
+        snapshot._column_values = dict(self._column_values)
+        return snapshot
+
+    @property
+    def is_calculating(self):
+        """True while some cells wait for the background recalculation."""
+
+        return bool(self._pending)
+
+    def _is_pending(self, row, col):
+        """Check if the cell is waiting for its value from the background engine."""
+
+        if not self._pending:
+            return False
+        node = (None, col) if col in self._column_formulas else (row, col)
+        return node in self._pending and not self._is_cached(node)
+
+    def _schedule_background(self):
+        """Cancel the running evaluation and restart it once the current edits are done."""
+
+        self._engine.cancel()
+        if not self._restart_scheduled:
+            # Edits made in one go (e.g. a paste) are collected into a single run
+            self._restart_scheduled = True
+            QtCore.QTimer.singleShot(0, self._start_background)
+
+    def _start_background(self):
+        self._restart_scheduled = False
+        if self._engine is None:
+            return
+        # Nodes evaluated on demand in the meantime are already up to date
+        self._pending = {node for node in self._pending if not self._is_cached(node)}
+        if self._pending:
+            # Visible cells come first; row order lets the batches be reported as a few contiguous ranges
+            nodes = sorted(self._pending, key=lambda node: (not self._is_visible(node), node[1],
+                                                            -1 if node[0] is None else node[0]))
+            self._engine.start(self.snapshot(), nodes)
+
+    def _apply_background_results(self, generation, results):
+        """Store a batch of values computed by the background engine and refresh their cells."""
+
+        if self._engine is None or generation != self._engine.generation:
+            return  # Computed from inputs that have been edited since
+        changed = []
+        for node, value in results:
+            if node not in self._pending:
+                continue
+            self._pending.discard(node)
+            row, col = node
+            if row is None:
+                if col in self._column_formulas:
+                    self._column_values[col] = value
+                    self._display.pop(col, None)
+            elif col not in self._column_formulas:
+                self._values[node] = value
+                self._display.get(col, {}).pop(row, None)
+            changed.append(node)
+        self.emit_changed_cells(changed)
+
+    def _background_finished(self, generation):
+        if self._engine is None or generation != self._engine.generation:
+            return
+        # Anything left is evaluated on demand
+        leftover = list(self._pending)
+        self._pending.clear()
+        self.emit_changed_cells(leftover)
+
+    def _cancel_background(self):
+        """Stop the background run; cells it hasn't delivered are evaluated on demand."""
+
+        if self._engine is not None:
+            self._engine.cancel()
+        self._pending.clear()
+
+    def changed_ranges(self, cells):
+        """Coalesce changed cells into rectangular ranges.
+        
+        Args:
+            cells: (row, col) pairs; row=None marks a whole recalculated column
+        
+        Returns:
+            List of (top, left, bottom, right) tuples
+        """
+
+        rows_by_col = {}
+        whole_columns = set()
+        for row, col in cells:
+            if not 0 <= col < self.columnCount():
+                continue
+            if row is None:
+                whole_columns.add(col)
+            elif 0 <= row < self.rowCount():
+                rows_by_col.setdefault(col, set()).add(row)
+        
+        # Consecutive rows of one column form a run
+        runs_by_col = {col: ((0, self.rowCount() - 1),) for col in whole_columns}
+        for col, rows in rows_by_col.items():
+            if col in whole_columns:
+                continue
+            runs = []
+            for row in sorted(rows):
+                if runs and row == runs[-1][1] + 1:
+                    runs[-1][1] = row
+                else:
+                    runs.append([row, row])
+            runs_by_col[col] = tuple(tuple(run) for run in runs)
+        
+        # Adjacent columns with identical runs are merged into one rectangle
+        blocks = []
+        for col in sorted(runs_by_col):
+            if blocks and blocks[-1][0] == runs_by_col[col] and blocks[-1][2] == col - 1:
+                blocks[-1][2] = col
+            else:
+                blocks.append([runs_by_col[col], col, col])
+        return [(top, left, bottom, right) for runs, left, right in blocks for top, bottom in runs]
+
+    def emit_changed_cells(self, cells):
+        """Emit dataChanged for the given cells as coalesced rectangular ranges."""
+
+        for top, left, bottom, right in self.changed_ranges(cells):
+            self.dataChanged.emit(self.index(top, left), self.index(bottom, right))
+
+    def cell_value(self, row, col):
+        """Return the evaluated value of the cell, computing it only if it isn't cached."""
+
+        if col in self._column_formulas:
+            return self._column_cell_value(row, col)
+        if col in self._external_columns:
+            return self._external_columns[col].value(row)
+        key = (row, col)
+        if key not in self._values:
+            self._evaluate_node(key)
+        return self._values[key]
+
+    def _is_cached(self, node):
+        """Check if the value of a cell or column formula node is already known."""
+
+        row, col = node
+        if row is None or col in self._column_formulas:
+            return col in self._column_values
+        return node in self._values
+
+    def _precedents_of(self, node):
+        """Return the in-bounds nodes whose values the node needs for its evaluation."""
+
+        row, col = node
+        if row is not None and col in self._column_formulas:
+            # Cells of a calculated column come from the column formula
+            return [(None, col)]
+        
+        formula = self._column_formulas[col] if row is None else self._store.get(row, col)
+        if not formula.startswith('='):
+            return []
+        compiled = self._compiler.compile(formula)
+        precedents = [(ref_row, ref_col) for ref_row, ref_col in compiled.references
+                      if 0 <= ref_row < self.rowCount() and 0 <= ref_col < self.columnCount()]
+        for source in compiled.columns:
+            if source in self._column_formulas:
+                precedents.append((None, source))
+            elif 0 <= source < self.columnCount():
+                precedents.extend((ref_row, source) for ref_row in self._store.formula_rows(source))
+        for source, first, last in compiled.ranges:
+            if source in self._column_formulas:
+                precedents.append((None, source))
+            elif 0 <= source < self.columnCount():
+                first, last = self._range_bounds(first, last)
+                precedents.extend((ref_row, source) for ref_row in self._store.formula_rows(source)
+                                  if first <= ref_row <= last)
+        return precedents
+
+    def _evaluate_node(self, node):
+        """
+        Evaluate an uncached node together with all of its uncached precedents.
+        
+        Uses an iterative version of Tarjan's strongly connected components algorithm
+        over the precedent edges, so long chains don't recurse and cycles are found in
+        O(V+E). Components come out precedents first, which is the evaluation order;
+        every node of a cyclic component is marked with CYCLE_VALUE.
+        """
+
+        index = {node: 0}
+        lowlink = {node: 0}
+        stack = [node]
+        on_stack = {node}
+        self_referencing = set()
+        work = [(node, iter(self._precedents_of(node)))]
+        
+        while work:
+            current, children = work[-1]
+            for child in children:
+                if self._is_cached(child):
+                    continue
+                if child not in index:
+                    index[child] = lowlink[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(self._precedents_of(child))))
+                    break
+                if child in on_stack:
+                    lowlink[current] = min(lowlink[current], index[child])
+                    if child == current:
+                        self_referencing.add(current)
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[current])
+                if lowlink[current] == index[current]:
+                    # current is the root of a strongly connected component
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == current:
+                            break
+                    cyclic = len(component) > 1 or current in self_referencing
+                    for member in component:
+                        self._store_node_value(member, cyclic)
+
+    def _store_node_value(self, node, cyclic=False):
+        """Evaluate a node whose precedents are known and cache its value."""
+
+        row, col = node
+        if row is not None and col in self._column_formulas:
+            return  # The value lives in the column formula result
+        if row is None:
+            self._column_values[col] = CYCLE_VALUE if cyclic else self._evaluate_column_formula(col)
+        else:
+            self._values[node] = CYCLE_VALUE if cyclic else self.evaluate_cell(row, col)
+
     def evaluate_cell(self, row, col):
         """Evaluate the formula in the specified cell."""
 
-        formula = self._formulas[row][col]
+        formula = self._store.get(row, col)
         if not formula.startswith('='):
             return formula
 
         try:
-            # Remove the equals sign and any spaces
-            expression = formula[1:].replace(' ', '')
-            expression = expression.split(", ")[0]
+            return self._compiler.compile(formula).evaluate(self.reference_value, range_lookup=self.range_value)
+        except Exception as e:
+            return f"#ERROR! ({str(e)})"
 
-            # Replace Excel-style power operator (^) with Python-style (**)
-            expression = expression.replace('^', '**')
+    def reference_value(self, row, col):
+        """Return the value a formula sees when it references the given cell."""
 
-            # Convert cell references (e.g., A1, B2) to their values
-            pattern = self.cell_patern
-            
-            def replace_match(match):
-                full_match = match.group(1)
-                col_ref = match.group(2).upper()
-                row_ref = int(match.group(3)) - 1 
-                
-                # Find column index by name
-                col_index = self.column_name_to_index(col_ref)
-
-                # Check if the reference is within bounds
-                if 0 <= row_ref < self.rowCount() and 0 <= col_index < self.columnCount():
-                    cell_value = self.evaluate_cell(row_ref, col_index)
-                    if self.is_number(cell_value):
-                        return str(float(cell_value))
-                    else:
-                        # If it's a string, wrap it in quotes for the expression
-                        return f'"{cell_value}"'
-                else:
-                    return '0'  # Out of bounds reference becomes 0
-            
-            # Replace all cell references with their values
-            expression = re.sub(pattern, replace_match, expression)
-            
-            # Use safe evaluation
-            return self._safe_eval(expression)
-            
+        # Check if the reference is within bounds
+        if 0 <= row < self.rowCount() and 0 <= col < self.columnCount():
+            cell_value = self.cell_value(row, col)
+            if cell_value == CYCLE_VALUE:
+                raise ValueError("Depends on a circular reference")
+            if self.is_number(cell_value):
+                return float(cell_value)
+            # Text values are passed to the expression as strings
+            return str(cell_value)
+        return 0  # Out of bounds reference becomes 0
+
+    def column_vector(self, col):
+        """Return the result of the column formula: a float64 array or an error string."""
+
+        if col not in self._column_values:
+            self._evaluate_node((None, col))
+        return self._column_values[col]
+
+    def _evaluate_column_formula(self, col):
+        """Evaluate the column formula once over all rows."""
+
+        try:
+            compiled = self._compiler.compile(self._column_formulas[col])
+            result = compiled.evaluate(self.reference_value, self._evaluated_column, self.range_value)
+            # Scalar results (e.g. only aggregates) are repeated on every row
+            return np.broadcast_to(np.asarray(result, dtype=float), (self.rowCount(),)).copy()
         except Exception as e:
             return f"#ERROR! ({str(e)})"
 
-    def _safe_eval(self, expr):
-        """Safely evaluate a mathematical expression"""
+    def _column_cell_value(self, row, col):
+        """Return the value of one cell of a calculated column."""
+
+        vector = self.column_vector(col)
+        if isinstance(vector, str):
+            return vector
+        if row >= len(vector) or np.isnan(vector[row]):
+            return ''
+        return float(vector[row])
+
+    def _evaluated_column(self, col):
+        """Return the evaluated values of a column as float64, NaN for blanks and text."""
+
+        if not 0 <= col < self.columnCount():
+            raise ValueError(f"Unknown column: {col}")
+        if col in self._column_formulas:
+            vector = self.column_vector(col)
+            if isinstance(vector, str):
+                raise ValueError(vector)
+            return vector
+        if col in self._external_columns:
+            return self._external_columns[col].values(self.rowCount())
         
-        try:
-            # Parse the expression into an AST
-            tree = ast.parse(expr, mode='eval')
-            
-            # Define a function to recursively evaluate the AST
-            def _eval(node):
-                if isinstance(node, ast.Num):
-                    return node.n
-                elif isinstance(node, ast.Str):
-                    return node.s
-                elif isinstance(node, ast.BinOp):
-                    left = _eval(node.left)
-                    right = _eval(node.right)
-                    operator_type = type(node.op)
-                    
-                    if operator_type in self._safe_operators:
-                        # Handle power operator specifically
-                        if operator_type is ast.Pow:
-                            # Ensure we don't allow very large exponents for safety
-                            if abs(right) > 1000:
-                                raise ValueError("Exponent too large")
-                            return self._safe_operators[operator_type](left, right)
-                        else:
-                            return self._safe_operators[operator_type](left, right)
-                    else:
-                        raise ValueError(f"Unsupported operator: {operator_type}")
-                elif isinstance(node, ast.UnaryOp):
-                    operand = _eval(node.operand)
-                    operator_type = type(node.op)
-                    
-                    if operator_type in self._safe_operators:
-                        return self._safe_operators[operator_type](operand)
-                    else:
-                        raise ValueError(f"Unsupported operator: {operator_type}")
-                elif isinstance(node, ast.Call):
-                    # Handle function calls
-                    if isinstance(node.func, ast.Name):
-                        func_name = node.func.id
-                        if func_name in self._safe_functions:
-                            args = [_eval(arg) for arg in node.args]
-                            return self._safe_functions[func_name](*args)
-                        else:
-                            raise ValueError(f"Unsupported function: {func_name}")
-                    else:
-                        raise ValueError("Unsupported function call type")
-                elif isinstance(node, ast.Name):
-                    # Handle named constants
-                    if node.id in self._safe_functions and not callable(self._safe_functions[node.id]):
-                        return self._safe_functions[node.id]
-                    else:
-                        raise ValueError(f"Unknown name: {node.id}")
-                else:
-                    raise ValueError(f"Unsupported expression type: {type(node)}")
-            
-            return _eval(tree.body)
-        except Exception as e:
-            raise ValueError(f"Evaluation error: {str(e)}")
+        values, mask = self._store.numeric_column(col)
+        formula_rows = self._store.formula_rows(col)
+        if formula_rows:
+            # Formula cells are taken from their evaluated values
+            values = values.copy()
+            for row in formula_rows:
+                value = self.cell_value(row, col)
+                values[row] = float(value) if self.is_number(value) else np.nan
+        return values
+
+    def _range_bounds(self, first, last):
+        """Clip a range to the table; last=None stands for the last row."""
+
+        last = self.rowCount() - 1 if last is None else min(last, self.rowCount() - 1)
+        return max(first, 0), last
+
+    def range_value(self, col, first, last):
+        """
+        Return the values of a range of one column as a read-only float64 array.
+        
+        The array is a view over the storage when no cell of the range holds a formula.
+        Results are cached until a cell inside the range changes.
+        
+        Args:
+            col: Column index
+            first: First row of the range
+            last: Last row of the range (inclusive), None for the whole column
+        
+        Returns:
+            Values of the cells, NaN for blank and text cells
+        """
+
+        if not 0 <= col < self.columnCount():
+            raise ValueError(f"Unknown column: {col}")
+        first, last = self._range_bounds(first, last)
+        cached = self._range_values.setdefault(col, {})
+        if (first, last) not in cached:
+            cached[(first, last)] = self._evaluate_range(col, first, last)
+        return cached[(first, last)]
+
+    def _evaluate_range(self, col, first, last):
+        """Collect the values of the range, evaluating only the formula cells inside it."""
+
+        if col in self._column_formulas:
+            vector = self.column_vector(col)
+            if isinstance(vector, str):
+                raise ValueError("Depends on a circular reference" if vector == CYCLE_VALUE else vector)
+            values = vector[first:last + 1]
+        elif col in self._external_columns:
+            values = self._external_columns[col].values(self.rowCount(), slice(first, last + 1))
+        else:
+            values = self._store.numeric_column(col)[0][first:last + 1]
+            formula_rows = [row for row in self._store.formula_rows(col) if first <= row <= last]
+            if formula_rows:
+                values = values.copy()
+                for row in formula_rows:
+                    value = self.cell_value(row, col)
+                    if value == CYCLE_VALUE:
+                        raise ValueError("Depends on a circular reference")
+                    values[row - first] = float(value) if self.is_number(value) else np.nan
+        values = values.view()
+        values.flags.writeable = False
+        return values
+
+    def _invalidate_ranges(self, row, col):
+        """Drop the cached ranges containing the cell (row=None: every range of the column)."""
+
+        cached = self._range_values.get(col)
+        if not cached:
+            return
+        for first, last in [key for key in cached if row is None or key[0] <= row <= key[1]]:
+            del cached[(first, last)]
+
+    def column_array(self, col, rows=None):
+        """
+        Return the full-precision values of a column as a read-only float64 array.
+        
+        Args:
+            col: Column index
+            rows: Optional slice or row indices; all rows by default
+        
+        Returns:
+            Values of the cells, NaN for blank, text and error cells
+        """
+
+        if col in self._column_formulas and isinstance(self.column_vector(col), str):
+            values = np.full(self.rowCount(), np.nan)
+        elif col in self._external_columns:
+            # Only the requested rows are read from the file
+            values = self._external_columns[col].values(self.rowCount(), rows)
+            rows = None
+        else:
+            values = self._evaluated_column(col)
+        if rows is not None:
+            values = values[rows]
+        # May be a view of the storage or of cached results, so it must not be modified
+        values = values.view()
+        values.flags.writeable = False
+        return values
+
+    def columns_array(self, cols, rows=None):
+        """Return the values of several columns as a 2D float64 array, one row per column."""
+
+        return np.vstack([self.column_array(col, rows) for col in cols])
 
     def evaluate_all(self):
         """Recalculate all formulas in the table."""
 
-        # Recalculate all formulas
+        # Drop cached values so every visible cell is evaluated again
+        self._cancel_background()
+        self._values.clear()
+        self._column_values.clear()
+        self._range_values.clear()
+        self._display.clear()
         self.dataChanged.emit(
             self.index(0, 0),
             self.index(self.rowCount() - 1, self.columnCount() - 1)
@@ -323,9 +1127,8 @@ class ExcelLikeModel(QtCore.QAbstractTableModel):
         try:
             # First try to find by custom name (case-insensitive)
             name_upper = name.upper()
-            for i, col_name in enumerate(self._column_names):
-                if col_name.upper() == name_upper:
-                    return i
+            if name_upper in self._column_index:
+                return self._column_index[name_upper]
             # If not found, try Excel-style conversion for backward compatibility
             index = 0
             for char in name.upper():
@@ -339,7 +1142,26 @@ class ExcelLikeModel(QtCore.QAbstractTableModel):
             # If the name doesn't match any pattern, return -1 (invalid)
             return -1
 
-    def index_to_column_name(self, index):
+    def column_index(self, name):
+        """Return the index of the column with exactly this name, or -1."""
+
+        if not name:
+            return -1
+        return self._exact_column_index.get(name, -1)
+
+    def _update_column_index(self):
+        """Rebuild the name-to-index maps used to resolve column references.
+        
+        When several columns share a name the first one wins, as in a linear scan."""
+
+        self._column_index = {}  # {upper-case name: index}
+        self._exact_column_index = {}  # {name: index}
+        for i, col_name in enumerate(self._column_names):
+            self._column_index.setdefault(col_name.upper(), i)
+            self._exact_column_index.setdefault(col_name, i)
+
+    @staticmethod
+    def index_to_column_name(index):
         """Convert zero-based column index to Excel-style name (A, B, ...)."""
         
         name = ""
@@ -352,60 +1174,327 @@ class ExcelLikeModel(QtCore.QAbstractTableModel):
     def clear_dependencies(self, row, col):
         """Remove this cell from all dependency lists."""
 
-        for key in list(self._dependencies.keys()):
-            if (row, col) in self._dependencies[key]:
+        for key in self._precedents.pop((row, col), []):
+            if (row, col) in self._dependencies.get(key, []):
                 self._dependencies[key].remove((row, col))
                 if not self._dependencies[key]:
                     del self._dependencies[key]
+        for source, first, last in self._range_precedents.pop((row, col), []):
+            self._range_dependents.get(source, set()).discard((first, last, (row, col)))
                     
     def adjust_formula_references(self, formula, row_offset, col_offset):
         """Adjust formula references based on row and column offsets."""
         
-        if not formula.startswith('='):
-            return formula
+        # References moved out of bounds are kept as written
+        template = FormulaTemplate(formula, self.column_name_to_index, self.cell_patern)
+        return template.instantiate(row_offset, col_offset, self._column_names, self.rowCount())
+
+    def load_block(self, rows, cols, formulas, headers=None, column_formulas=None, external_columns=None):
+        """Replace the whole table contents in one step.
         
-        # Pattern to match cell references (e.g., A1, BC23)
-        pattern = self.cell_patern
+        Used by the CSV/JSON loaders and state restore instead of calling setData
+        for every cell: views are reset once, the dependency graph is rebuilt in a
+        single pass and values are recalculated on demand from an empty cache.
         
-        def adjust_match(match):
-            full_match = match.group(1)
-            col_name = match.group(2)
-            row_num = int(match.group(3))
-            
-            # Convert column name to index, adjust, then back to name
-            col_idx = self.column_name_to_index(col_name)
-            if col_idx == -1:
-                return full_match
-            
-            adjusted_col_idx = col_idx + col_offset
-            adjusted_row = row_num + row_offset
-            
-            # Check if adjusted indices are valid
-            if (0 <= adjusted_col_idx < self.columnCount() and 
-                1 <= adjusted_row <= self.rowCount()):  # Note: row numbers are 1-based
-                adjusted_col_name = self._column_names[adjusted_col_idx]
-                return f"[{adjusted_col_name}]{adjusted_row}"
-            else:
-                # Return original reference if adjusted is out of bounds
-                return full_match
+        Args:
+            rows: Number of rows of the new table
+            cols: Number of columns of the new table
+            formulas: Raw cell contents as a list of rows (extra rows/columns are ignored)
+            headers: Column names; missing names get Excel-style defaults
+            column_formulas: Whole-column formulas as {col: formula}
+            external_columns: External data files as {col: spec} (see get_external_columns)
+        """
+
+        store = type(self._store)(rows, cols)
+        for row, cells in enumerate(formulas[:rows]):
+            for col, value in enumerate(cells[:cols]):
+                if value:
+                    store.set(row, col, value)
+        return self._replace_store(store, headers, column_formulas, external_columns)
+
+    def load_columns(self, rows, columns, headers=None, column_formulas=None, external_columns=None):
+        """Replace the whole table with column data parsed in bulk (e.g. by csv_import).
+        
+        Args:
+            rows: Number of rows of the new table
+            columns: (values, mask, {row: text}) per column; values and mask are
+                     float64/bool arrays of at most rows elements
+            headers: Column names; missing names get Excel-style defaults
+            column_formulas: Whole-column formulas as {col: formula}
+            external_columns: External data files as {col: spec} (see get_external_columns)
+        """
+
+        store = type(self._store)(rows, len(columns))
+        for col, (values, mask, texts) in enumerate(columns):
+            store.set_column(col, values, mask, texts)
+        return self._replace_store(store, headers, column_formulas, external_columns)
+
+    def _replace_store(self, store, headers=None, column_formulas=None, external_columns=None):
+        """Install a new storage with its column names and formulas, resetting the views once."""
+
+        cols = store.column_count
+        self.beginResetModel()
+        self._store = store
+        self._external_columns = {}
+        for col, spec in (external_columns or {}).items():
+            if not 0 <= int(col) < cols:
+                continue
+            try:
+                self._external_columns[int(col)] = ExternalColumn(spec["path"], spec.get("dtype"), spec.get("offset", 0))
+            except (OSError, ValueError) as e:
+                # The column stays empty if its file was moved or changed
+                logging.warning(f"Cannot attach data file {spec.get('path')}: {e}")
+        
+        headers = list(headers or [])[:cols]
+        self.last_columnn_name = max(self.last_columnn_name, cols)
+        self._column_names = headers + [self.index_to_column_name(i) for i in range(len(headers), cols)]
+        self._update_column_index()
+        self._column_formulas = {int(col): formula for col, formula in (column_formulas or {}).items()
+                                 if 0 <= int(col) < cols}
         
+        self.invalidate_structure()
+        self.rebuild_dependencies()
+        if self._engine is not None:
+            nodes = [(row, col) for row, col, _ in self._store.formula_cells()]
+            nodes += [(None, col) for col in self._column_formulas]
+            if len(nodes) >= self._background_threshold:
+                self._pending.update(nodes)
+                self._schedule_background()
+        self.endResetModel()
+        # A loaded table can't be undone
+        self._history.clear()
+        # The new contents can't be described by edits
+        self.edited.emit({"op": "reset"})
+        return True
+
+    def replay(self, record):
+        """Apply a journal record emitted by edited, e.g. when recovering an autosave."""
+
+        op = record.get("op")
+        if op == "set":
+            self.setData(self.index(record["row"], record["col"]), record["value"])
+        elif op == "set_many":
+            self.set_cells(record["cells"])
+        elif op == "insert_row":
+            self.insertRow(record["row"])
+        elif op == "remove_row":
+            self.removeRow(record["row"])
+        elif op == "append_rows":
+            self._append_rows(record["count"])
+        elif op == "truncate_rows":
+            self._truncate_rows(record["rows"])
+        elif op == "insert_column":
+            self.insertColumn(record["col"])
+            self.setHeaderData(record["col"], Qt.Orientation.Horizontal, record["name"])
+        elif op == "remove_column":
+            self.removeColumn(record["col"])
+        elif op == "rename":
+            self.setHeaderData(record["col"], Qt.Orientation.Horizontal, record["name"])
+        elif op == "decimal_places":
+            self.set_decimal_places(record["value"])
+        elif op == "external":
+            self.set_external_column(record["col"], record["spec"])
+
+    def _record(self, delta):
+        """Add an edit to the undo history unless it is made by undo or redo."""
+
+        if not self._undoing:
+            self._history.record(delta)
+
+    def begin_macro(self):
+        """Group the following edits into one undo step until end_macro (e.g. for a paste)."""
+
+        self._history.begin_group()
+
+    def end_macro(self):
+        self._history.end_group()
+
+    def set_undo_limit(self, memory_limit, command_limit=UNDO_COMMAND_LIMIT):
+        """Set how much undo history is kept.
+        
+        Args:
+            memory_limit: Estimated bytes of edits kept; the oldest steps are dropped first
+            command_limit: Maximum number of undo steps
+        """
+
+        self._history.memory_limit = memory_limit
+        self._history.command_limit = command_limit
+        self._history.trim()
+
+    def can_undo(self):
+        return self._history.can_undo()
+
+    def can_redo(self):
+        return self._history.can_redo()
+
+    def undo(self):
+        """Revert the last edit or group of edits; False if there is nothing to undo."""
+
+        deltas = self._history.take_undo()
+        if deltas is None:
+            return False
+        self._apply_deltas(reversed(deltas), undo=True)
+        return True
+
+    def redo(self):
+        """Apply the last undone edit or group of edits again; False if there is nothing to redo."""
+
+        deltas = self._history.take_redo()
+        if deltas is None:
+            return False
+        self._apply_deltas(deltas, undo=False)
+        return True
+
+    def _apply_deltas(self, deltas, undo):
+        """Apply recorded deltas, or their inverses, through the regular editing methods.
+        
+        That way undo recalculates only the dependents of what it changes, and every
+        change is journaled like a forward edit."""
+
+        self._undoing = True
         try:
-            adjusted_formula = re.sub(pattern, adjust_match, formula)
-            return adjusted_formula
-        except:
-            return formula
+            for delta in deltas:
+                self._apply_delta(delta, undo)
+        finally:
+            self._undoing = False
+
+    def _apply_delta(self, delta, undo):
+        kind = delta[0]
+        if kind == "set":
+            _, row, col, old, new = delta
+            self.setData(self.index(row, col), old if undo else new)
+        elif kind == "column":
+            _, col, old_formula, old_data, new_formula = delta
+            formula = old_formula if undo else new_formula
+            if formula is not None:
+                self.setData(self.index(0, col), formula)
+            else:
+                self._restore_column(col, old_data if undo else None)
+        elif kind == "insert_row":
+            if undo:
+                self.removeRow(delta[1])
+            else:
+                self.insertRow(delta[1])
+        elif kind == "remove_row":
+            _, row, cells = delta
+            if undo:
+                self.insertRow(row)
+                for col, text in enumerate(cells):
+                    if text:
+                        self.setData(self.index(row, col), text)
+            else:
+                self.removeRow(row)
+        elif kind == "append_rows":
+            _, first, count = delta
+            if undo:
+                self._truncate_rows(first)
+            elif first + count > self.rowCount():
+                # Attaching the file again may have added the rows already
+                self._append_rows(first + count - self.rowCount())
+        elif kind == "insert_column":
+            _, col, name = delta
+            if undo:
+                self.removeColumn(col)
+            else:
+                self.insertColumn(col)
+                self.setHeaderData(col, Qt.Orientation.Horizontal, name)
+        elif kind == "remove_column":
+            _, col, name, formula, data, spec = delta
+            if undo:
+                self.insertColumn(col)
+                self.setHeaderData(col, Qt.Orientation.Horizontal, name)
+                if formula is not None:
+                    self.setData(self.index(0, col), formula)
+                elif data is not None:
+                    self._restore_column(col, data)
+                if spec is not None:
+                    self.set_external_column(col, spec)
+            else:
+                self.removeColumn(col)
+        elif kind == "rename":
+            _, col, old, new = delta
+            self.setHeaderData(col, Qt.Orientation.Horizontal, old if undo else new)
+        elif kind == "external":
+            _, col, spec = delta
+            self.set_external_column(col, None if undo else spec)
+
+    def attach_external_column(self, path, dtype=None, offset=0, name=None, column=None):
+        """Add a read-only column served lazily from a .npy or raw binary file.
+        
+        The file is memory-mapped, so it is never loaded as a whole. The table grows
+        to the length of the file if needed. Rows inserted or removed later don't
+        move the file's values.
+        
+        Args:
+            path: .npy file or raw binary file
+            dtype: Number type of a raw file (see external_data.RAW_DTYPES)
+            offset: Bytes to skip at the start of a raw file
+            name: Column name; derived from the file name by default
+            column: Position of the new column; appended by default
+        
+        Returns:
+            Index of the new column
+        """
+
+        external = ExternalColumn(path, dtype, offset)
+        column = self.columnCount() if column is None else column
+        self.begin_macro()
+        self.insertColumn(column)
+        self.setHeaderData(column, Qt.Orientation.Horizontal, name or external.name)
+        self._set_external_column(column, external)
+        self.end_macro()
+        return column
+
+    def set_external_column(self, col, spec):
+        """Serve an existing column from the data file described by spec (see get_external_columns).
+        
+        spec=None detaches the file and leaves the column empty."""
+
+        if spec is None:
+            if self._external_columns.pop(col, None) is not None:
+                self._record(("external", col, None))
+                self.invalidate_structure()
+                self.evaluate_all()
+                self.edited.emit({"op": "external", "col": col, "spec": None})
+            return
+        self._set_external_column(col, ExternalColumn(spec["path"], spec.get("dtype"), spec.get("offset", 0)))
+
+    def _set_external_column(self, col, external):
+        self._record(("external", col, external.spec()))
+        self._external_columns[col] = external
+        if len(external) > self.rowCount():
+            # Recorded as its own step of the group, so undoing the attach restores the row count
+            self._append_rows(len(external) - self.rowCount())
+        self.invalidate_structure()
+        self.evaluate_all()
+        self.edited.emit({"op": "external", "col": col, "spec": external.spec()})
+
+    def get_external_columns(self):
+        """Return {col: spec} of the external data columns (see ExternalColumn.spec)."""
+
+        return {col: external.spec() for col, external in self._external_columns.items()}
+
+    def is_external_column(self, col):
+        """Check if the column is served from an external data file."""
+
+        return col in self._external_columns
 
     def insertColumn(self, column, parent=QtCore.QModelIndex()):
         """Insert a new column at the specified position"""
         
         self.beginInsertColumns(parent, column, column)
-        for row in self._data:
-            row.insert(column, '')
-        for row in self._formulas:
-            row.insert(column, '')
+        self._store.insert_column(column)
+        self._column_formulas = {(col + 1 if col >= column else col): formula
+                                 for col, formula in self._column_formulas.items()}
+        self._external_columns = {(col + 1 if col >= column else col): external
+                                  for col, external in self._external_columns.items()}
         self._column_names.insert(column, self.index_to_column_name(self.last_columnn_name))
+        self._update_column_index()
         self.last_columnn_name += 1
+        self._record(("insert_column", column, self._column_names[column]))
+        self.invalidate_structure()
         self.endInsertColumns()
+        self.edited.emit({"op": "insert_column", "col": column, "name": self._column_names[column]})
         return True
 
     def removeColumn(self, column, parent=QtCore.QModelIndex()):
@@ -413,23 +1502,57 @@ class ExcelLikeModel(QtCore.QAbstractTableModel):
         
         if column < 0 or column >= self.columnCount():
             return False
-            
+        
+        if not self._undoing:
+            external = self._external_columns.get(column)
+            self._record(("remove_column", column, self._column_names[column], self._column_formulas.get(column),
+                          self._column_contents(column), external.spec() if external is not None else None))
         self.beginRemoveColumns(parent, column, column)
-        for row in self._data:
-            del row[column]
-        for row in self._formulas:
-            del row[column]
+        self._store.remove_column(column)
+        self._column_formulas = {(col - 1 if col > column else col): formula
+                                 for col, formula in self._column_formulas.items() if col != column}
+        self._external_columns = {(col - 1 if col > column else col): external
+                                  for col, external in self._external_columns.items() if col != column}
         del self._column_names[column]
+        self._update_column_index()
+        self.invalidate_structure()
         self.endRemoveColumns()
+        self.edited.emit({"op": "remove_column", "col": column})
         return True
 
+    def _append_rows(self, count):
+        """Add empty rows at the end of the table in one step."""
+
+        first = self.rowCount()
+        self._record(("append_rows", first, count))
+        self.beginInsertRows(QtCore.QModelIndex(), first, first + count - 1)
+        self._store.append_rows(count)
+        self.invalidate_structure()
+        self.endInsertRows()
+        self.edited.emit({"op": "append_rows", "count": count})
+
+    def _truncate_rows(self, rows):
+        """Remove every row from the given one on in one step (the inverse of _append_rows).
+        
+        Only undo removes rows this way, so the removed rows are not recorded."""
+
+        if rows >= self.rowCount():
+            return
+        self.beginRemoveRows(QtCore.QModelIndex(), rows, self.rowCount() - 1)
+        self._store.truncate(rows)
+        self.invalidate_structure()
+        self.endRemoveRows()
+        self.edited.emit({"op": "truncate_rows", "rows": rows})
+
     def insertRow(self, row, parent=QtCore.QModelIndex()):
         """Insert a new row at the specified position"""
         
+        self._record(("insert_row", row))
         self.beginInsertRows(parent, row, row)
-        self._data.insert(row, [''] * self.columnCount())
-        self._formulas.insert(row, [''] * self.columnCount())
+        self._store.insert_row(row)
+        self.invalidate_structure()
         self.endInsertRows()
+        self.edited.emit({"op": "insert_row", "row": row})
         return True
 
     def removeRow(self, row, parent=QtCore.QModelIndex()):
@@ -437,17 +1560,20 @@ class ExcelLikeModel(QtCore.QAbstractTableModel):
         
         if row < 0 or row >= self.rowCount():
             return False
-            
+        
+        self._record(("remove_row", row, [self._store.get(row, col) for col in range(self.columnCount())]))
         self.beginRemoveRows(parent, row, row)
-        del self._data[row]
-        del self._formulas[row]
+        self._store.remove_row(row)
+        self.invalidate_structure()
         self.endRemoveRows()
+        self.edited.emit({"op": "remove_row", "row": row})
         return True
     
     def setColumnCount(self, cols):
         """Set the number of columns in the model"""
         
         current_cols = self.columnCount()
+        self.begin_macro()
         if cols > current_cols:
             # Add columns
             for _ in range(cols - current_cols):
@@ -456,12 +1582,14 @@ class ExcelLikeModel(QtCore.QAbstractTableModel):
             # Remove columns
             for _ in range(current_cols - cols):
                 self.removeColumn(current_cols - 1)
+        self.end_macro()
         return True
 
     def setRowCount(self, rows):
         """Set the number of rows in the model"""
         
         current_rows = self.rowCount()
+        self.begin_macro()
         if rows > current_rows:
             # Add rows
             for _ in range(rows - current_rows):
@@ -470,6 +1598,7 @@ class ExcelLikeModel(QtCore.QAbstractTableModel):
             # Remove rows
             for _ in range(current_rows - rows):
                 self.removeRow(current_rows - 1)
+        self.end_macro()
         return True
 
 class FormulaLineEdit(QtWidgets.QLineEdit):
@@ -506,6 +1635,32 @@ class ExcelTableView(QtWidgets.QTableView):
                                             "If you want to enter units according to the values, enter them after comma.\n"
                                             "For example: \"lenght, m\"")
         
+    def updateGeometries(self):
+        """Report the visible cells to the model after resizes and model changes."""
+
+        super().updateGeometries()
+        self.update_visible_range()
+
+    def scrollContentsBy(self, dx, dy):
+        super().scrollContentsBy(dx, dy)
+        self.update_visible_range()
+
+    def update_visible_range(self):
+        """Tell the model which cells are inside the viewport so it evaluates only those eagerly."""
+
+        model = self.model()
+        if not isinstance(model, ExcelLikeModel) or not model.rowCount() or not model.columnCount():
+            return
+        rect = self.viewport().rect()
+        top = max(self.rowAt(rect.top()), 0)
+        left = max(self.columnAt(rect.left()), 0)
+        # Past the last row or column the view reports -1
+        bottom = self.rowAt(rect.bottom())
+        right = self.columnAt(rect.right())
+        model.set_visible_range(top, left,
+                                model.rowCount() - 1 if bottom < 0 else bottom,
+                                model.columnCount() - 1 if right < 0 else right)
+
     def editColumnHeader(self, section):
         """Edit the column header at the given section."""
         
@@ -0,0 +1,124 @@
+"""
+Undo/redo history for the Excel-like table:
+- Every user action is one command, a list of deltas (old and new formula of a
+  cell, inserted or removed rows and columns with their contents, renames)
+- Bulk edits such as pasting or filling a selection are grouped into one command
+- The memory taken by the deltas is capped; the oldest commands are dropped first
+"""
+
+import sys
+import numpy as np
+
+
+UNDO_MEMORY_LIMIT: int = 64 * 1024 * 1024  # Bytes of deltas kept by default
+UNDO_COMMAND_LIMIT: int = 1000  # Commands kept by default
+
+
+def delta_size(delta: tuple) -> int:
+    """Estimate the memory taken by a delta in bytes."""
+
+    size = sys.getsizeof(delta)
+    for item in delta:
+        if isinstance(item, np.ndarray):
+            size += item.nbytes
+        elif isinstance(item, str):
+            size += sys.getsizeof(item)
+        elif isinstance(item, (list, tuple)):
+            size += delta_size(tuple(item))
+        elif isinstance(item, dict):
+            size += sys.getsizeof(item) + sum(sys.getsizeof(text) for text in item.values())
+    return size
+
+
+class UndoStack:
+    """
+    Undo and redo stacks of commands.
+    A command is a list of deltas applied in order; undoing applies their inverses in
+    reverse order. Pushing a new command clears the redo stack.
+    """
+
+    def __init__(self, memory_limit: int = UNDO_MEMORY_LIMIT, command_limit: int = UNDO_COMMAND_LIMIT):
+        """
+        Args:
+            memory_limit: Maximum estimated size of all kept deltas in bytes
+            command_limit: Maximum number of undoable commands
+        """
+
+        self.memory_limit = memory_limit
+        self.command_limit = command_limit
+        self._undo = []  # [(deltas, size)]
+        self._redo = []
+        self._size = 0
+        self._group = None  # Deltas of the open group
+        self._depth = 0
+
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def clear(self) -> None:
+        """Forget the whole history (e.g. when another table is loaded)."""
+
+        self._undo.clear()
+        self._redo.clear()
+        self._size = 0
+
+    def begin_group(self) -> None:
+        """Collect the following deltas into one command until end_group (groups can be nested)."""
+
+        if self._depth == 0:
+            self._group = []
+        self._depth += 1
+
+    def end_group(self) -> None:
+        if self._depth == 0:
+            return
+        self._depth -= 1
+        if self._depth == 0:
+            group, self._group = self._group, None
+            if group:
+                self._push(group)
+
+    def record(self, delta: tuple) -> None:
+        """Add a delta, as a command of its own unless a group is open."""
+
+        if self._group is not None:
+            self._group.append(delta)
+        else:
+            self._push([delta])
+
+    def _push(self, deltas: list) -> None:
+        size = sum(delta_size(delta) for delta in deltas)
+        self._undo.append((deltas, size))
+        self._size += size
+        for _, redo_size in self._redo:
+            self._size -= redo_size
+        self._redo.clear()
+        self.trim()
+
+    def trim(self) -> None:
+        """Drop the oldest commands until the history fits the limits."""
+
+        while self._undo and (self._size > self.memory_limit or len(self._undo) > self.command_limit):
+            _, size = self._undo.pop(0)
+            self._size -= size
+
+    def take_undo(self) -> list | None:
+        """Move the last command to the redo stack and return its deltas."""
+
+        if not self._undo:
+            return None
+        command = self._undo.pop()
+        self._redo.append(command)
+        return command[0]
+
+    def take_redo(self) -> list | None:
+        """Move the last undone command back to the undo stack and return its deltas."""
+
+        if not self._redo:
+            return None
+        command = self._redo.pop()
+        self._undo.append(command)
+        return command[0]
@@ -0,0 +1,339 @@
+"""
+Cell storage backends for the Excel-like table model:
+- ListStore keeps every cell as a string in a list of lists
+- ColumnarStore keeps numbers in float64 arrays with a validity mask per column
+  and stores text and formulas sparsely
+"""
+
+import re
+import numpy as np
+
+
+NUMBER_PATTERN = re.compile(r'[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?|[+-]?(inf|infinity)', re.IGNORECASE)
+
+
+def format_number(value: float) -> str:
+    """Return the shortest text that converts back to the same float."""
+
+    text = repr(float(value))
+    if text.endswith('.0'):
+        text = text[:-2]
+    return text
+
+
+def parse_number(text: str) -> float | None:
+    """Return the float stored in the text, or None if the text is not a plain number literal."""
+
+    # float() also accepts underscores and other spellings that shouldn't turn text into numbers
+    if not isinstance(text, str) or not NUMBER_PATTERN.fullmatch(text.strip()):
+        return None
+    try:
+        value = float(text)
+    except ValueError:
+        return None
+    if value != value:  # NaN is kept as text so it isn't confused with a blank cell
+        return None
+    return value
+
+
+class ListStore:
+    """Row-major storage of the raw cell text (values and formulas)."""
+
+    def __init__(self, rows: int, cols: int):
+        self._cells = [['' for _ in range(cols)] for _ in range(rows)]
+        self._columns = cols
+
+    @property
+    def row_count(self) -> int:
+        return len(self._cells)
+
+    @property
+    def column_count(self) -> int:
+        return self._columns
+
+    def get(self, row: int, col: int) -> str:
+        """Return the raw text of the cell."""
+
+        return self._cells[row][col]
+
+    def set(self, row: int, col: int, text: str) -> None:
+        """Store the raw text of the cell."""
+
+        self._cells[row][col] = text
+
+    def insert_row(self, row: int) -> None:
+        self._cells.insert(row, [''] * self._columns)
+
+    def append_rows(self, count: int) -> None:
+        self._cells.extend([''] * self._columns for _ in range(count))
+
+    def truncate(self, rows: int) -> None:
+        """Remove every row from the given one on."""
+
+        del self._cells[rows:]
+
+    def remove_row(self, row: int) -> None:
+        del self._cells[row]
+
+    def insert_column(self, col: int) -> None:
+        for cells in self._cells:
+            cells.insert(col, '')
+        self._columns += 1
+
+    def remove_column(self, col: int) -> None:
+        for cells in self._cells:
+            del cells[col]
+        self._columns -= 1
+
+    def formula_cells(self):
+        """Yield (row, col, formula) for every cell holding a formula."""
+
+        for row, cells in enumerate(self._cells):
+            for col, text in enumerate(cells):
+                if text.startswith('='):
+                    yield row, col, text
+
+    def formula_rows(self, col: int) -> list[int]:
+        """Return the rows of the column holding a formula."""
+
+        return [row for row, cells in enumerate(self._cells) if cells[col].startswith('=')]
+
+    def clear_column(self, col: int) -> None:
+        for cells in self._cells:
+            cells[col] = ''
+
+    def set_column(self, col: int, values: np.ndarray, mask: np.ndarray, texts: dict) -> None:
+        """Replace the column with parsed numbers (where mask is set) and {row: text} cells."""
+
+        for row in np.flatnonzero(mask[:self.row_count]).tolist():
+            self._cells[row][col] = format_number(values[row])
+        for row, text in texts.items():
+            if row < self.row_count:
+                self._cells[row][col] = text
+
+    def column_data(self, col: int) -> tuple[np.ndarray, np.ndarray, dict]:
+        """Return (values, mask, {row: text}) of the column, the layout taken by set_column."""
+
+        values, mask = self.numeric_column(col)
+        texts = {row: cells[col] for row, cells in enumerate(self._cells)
+                 if cells[col] and (not mask[row] or format_number(values[row]) != cells[col].strip())}
+        return values, mask, texts
+
+    def numeric_column(self, col: int) -> tuple[np.ndarray, np.ndarray]:
+        """Return (values, mask) of the literal numbers stored in the column."""
+
+        values = np.full(self.row_count, np.nan)
+        mask = np.zeros(self.row_count, dtype=bool)
+        for row, cells in enumerate(self._cells):
+            value = parse_number(cells[col])
+            if value is not None:
+                values[row] = value
+                mask[row] = True
+        return values, mask
+
+    def used_row_count(self) -> int:
+        """Return the number of rows up to the last one holding any content."""
+
+        for row in range(len(self._cells) - 1, -1, -1):
+            if any(self._cells[row]):
+                return row + 1
+        return 0
+
+    def to_matrix(self, rows: int | None = None) -> list[list[str]]:
+        """Return the raw text of all cells (or of the first rows) as a list of rows."""
+
+        return [list(cells) for cells in self._cells[:rows]]
+
+    def copy(self) -> 'ListStore':
+        """Return an independent copy of the storage."""
+
+        store = ListStore(0, self._columns)
+        store._cells = [list(cells) for cells in self._cells]
+        return store
+
+
+class ColumnarStore:
+    """
+    Column-major storage.
+    Numbers live in a float64 array plus a boolean validity mask per column, so a
+    numeric cell costs 8 bytes (and one mask byte) and whole columns can be handed
+    to NumPy directly. Text and formulas live in a sparse {row: text} dict per column.
+    A number that isn't written the way format_number writes it (e.g. '1.50' or '007')
+    is kept in both: its value in the arrays and its original text in the dict,
+    which takes precedence when the cell is read.
+    Arrays may be shorter than the row count; missing rows are blank.
+    """
+
+    def __init__(self, rows: int, cols: int):
+        self._rows = rows
+        self._values = [np.empty(0) for _ in range(cols)]
+        self._masks = [np.zeros(0, dtype=bool) for _ in range(cols)]
+        self._text = [{} for _ in range(cols)]
+
+    @property
+    def row_count(self) -> int:
+        return self._rows
+
+    @property
+    def column_count(self) -> int:
+        return len(self._values)
+
+    def get(self, row: int, col: int) -> str:
+        """Return the raw text of the cell."""
+
+        text = self._text[col].get(row)
+        if text is not None:
+            return text
+        if row < len(self._masks[col]) and self._masks[col][row]:
+            return format_number(self._values[col][row])
+        return ''
+
+    def set(self, row: int, col: int, text: str) -> None:
+        """Store the cell as a number when possible, otherwise as sparse text."""
+
+        value = parse_number(text)
+        if value is not None:
+            if format_number(value) == text.strip():
+                self._text[col].pop(row, None)
+            else:
+                self._text[col][row] = text
+            self._reserve(col, row + 1)
+            self._values[col][row] = value
+            self._masks[col][row] = True
+            return
+
+        if row < len(self._masks[col]):
+            self._masks[col][row] = False
+            self._values[col][row] = np.nan
+        if text:
+            self._text[col][row] = text
+        else:
+            self._text[col].pop(row, None)
+
+    def _reserve(self, col: int, size: int) -> None:
+        """Grow the arrays of the column geometrically so they hold at least size rows."""
+
+        current = len(self._values[col])
+        if size <= current:
+            return
+        capacity = max(size, 2 * current, 16)
+        values = np.full(capacity, np.nan)
+        mask = np.zeros(capacity, dtype=bool)
+        values[:current] = self._values[col]
+        mask[:current] = self._masks[col]
+        self._values[col] = values
+        self._masks[col] = mask
+
+    def insert_row(self, row: int) -> None:
+        for col in range(self.column_count):
+            if row < len(self._values[col]):
+                self._values[col] = np.insert(self._values[col], row, np.nan)
+                self._masks[col] = np.insert(self._masks[col], row, False)
+            self._text[col] = {(r + 1 if r >= row else r): text for r, text in self._text[col].items()}
+        self._rows += 1
+
+    def append_rows(self, count: int) -> None:
+        # Arrays are allowed to be shorter than the row count, so nothing is allocated
+        self._rows += count
+
+    def truncate(self, rows: int) -> None:
+        """Remove every row from the given one on."""
+
+        for col in range(self.column_count):
+            self._values[col] = self._values[col][:rows]
+            self._masks[col] = self._masks[col][:rows]
+            if self._text[col] and max(self._text[col]) >= rows:
+                self._text[col] = {row: text for row, text in self._text[col].items() if row < rows}
+        self._rows = min(self._rows, rows)
+
+    def remove_row(self, row: int) -> None:
+        for col in range(self.column_count):
+            if row < len(self._values[col]):
+                self._values[col] = np.delete(self._values[col], row)
+                self._masks[col] = np.delete(self._masks[col], row)
+            self._text[col] = {(r - 1 if r > row else r): text
+                               for r, text in self._text[col].items() if r != row}
+        self._rows -= 1
+
+    def insert_column(self, col: int) -> None:
+        self._values.insert(col, np.empty(0))
+        self._masks.insert(col, np.zeros(0, dtype=bool))
+        self._text.insert(col, {})
+
+    def remove_column(self, col: int) -> None:
+        del self._values[col]
+        del self._masks[col]
+        del self._text[col]
+
+    def formula_cells(self):
+        """Yield (row, col, formula) for every cell holding a formula."""
+
+        for col, texts in enumerate(self._text):
+            for row, text in texts.items():
+                if text.startswith('='):
+                    yield row, col, text
+
+    def formula_rows(self, col: int) -> list[int]:
+        """Return the rows of the column holding a formula."""
+
+        return [row for row, text in self._text[col].items() if text.startswith('=')]
+
+    def clear_column(self, col: int) -> None:
+        self._values[col] = np.empty(0)
+        self._masks[col] = np.zeros(0, dtype=bool)
+        self._text[col] = {}
+
+    def set_column(self, col: int, values: np.ndarray, mask: np.ndarray, texts: dict) -> None:
+        """Replace the column with parsed numbers (where mask is set) and {row: text} cells.
+        
+        The arrays are taken over without copying; values must be NaN where mask is not set."""
+
+        size = min(len(values), self._rows)
+        self._values[col] = np.asarray(values[:size], dtype=float)
+        self._masks[col] = np.asarray(mask[:size], dtype=bool)
+        self._text[col] = {row: text for row, text in texts.items() if row < self._rows and text}
+
+    def column_data(self, col: int) -> tuple[np.ndarray, np.ndarray, dict]:
+        """Return (values, mask, {row: text}) of the column, the layout taken by set_column."""
+
+        values, mask = self.numeric_column(col)
+        return values, mask, dict(self._text[col])
+
+    def numeric_column(self, col: int) -> tuple[np.ndarray, np.ndarray]:
+        """Return (values, mask) of the literal numbers stored in the column."""
+
+        size = min(len(self._values[col]), self._rows)
+        if size == self._rows:
+            return self._values[col][:size], self._masks[col][:size]
+        values = np.full(self._rows, np.nan)
+        mask = np.zeros(self._rows, dtype=bool)
+        values[:size] = self._values[col][:size]
+        mask[:size] = self._masks[col][:size]
+        return values, mask
+
+    def used_row_count(self) -> int:
+        """Return the number of rows up to the last one holding any content."""
+
+        used = 0
+        for mask, texts in zip(self._masks, self._text):
+            filled = np.flatnonzero(mask[:self._rows])
+            if len(filled):
+                used = max(used, int(filled[-1]) + 1)
+            if texts:
+                used = max(used, max(texts) + 1)
+        return used
+
+    def to_matrix(self, rows: int | None = None) -> list[list[str]]:
+        """Return the raw text of all cells (or of the first rows) as a list of rows."""
+
+        rows = self._rows if rows is None else min(rows, self._rows)
+        return [[self.get(row, col) for col in range(self.column_count)] for row in range(rows)]
+
+    def copy(self) -> 'ColumnarStore':
+        """Return an independent copy of the storage."""
+
+        store = ColumnarStore(self._rows, 0)
+        store._values = [values.copy() for values in self._values]
+        store._masks = [mask.copy() for mask in self._masks]
+        store._text = [dict(texts) for texts in self._text]
+        return store
@@ -0,0 +1,66 @@
+"""
+TeX renderability check for the labels of the interactive plot:
+- Whether a label can be rendered with usetex is found by running LaTeX on the
+  label alone, not by drawing the whole figure
+- The result is cached per label text, so every text is checked only once
+- The check runs on a QThreadPool worker; until it is done the label is drawn without TeX
+"""
+
+import threading
+from matplotlib.texmanager import TexManager
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+
+PROBE_FONT_SIZE: int = 10  # Font size of the probe; it doesn't change whether a text compiles
+
+_renderable: dict[str, bool] = {}  # label text -> can be rendered with TeX
+_lock = threading.Lock()
+
+
+def tex_renderable(text: str) -> bool | None:
+    """
+    Get the cached result of the check of a label.
+
+    Returns:
+        True or False, or None if the text wasn't checked yet
+    """
+
+    if not text:
+        return True
+    with _lock:
+        return _renderable.get(text)
+
+
+def check_tex(text: str) -> bool:
+    """Check if a label can be rendered with TeX and cache the result."""
+
+    cached = tex_renderable(text)
+    if cached is not None:
+        return cached
+    try:
+        # Runs latex and dvipng, as drawing the text with the Agg canvas does
+        TexManager.get_grey(text, fontsize=PROBE_FONT_SIZE)
+        renderable = True
+    except Exception:
+        renderable = False
+    with _lock:
+        _renderable[text] = renderable
+    return renderable
+
+
+class TexCheckSignals(QObject):
+    """Signals of a TeX check task."""
+
+    finished = pyqtSignal(str, bool)  # label text, can be rendered with TeX
+
+
+class TexCheckTask(QRunnable):
+    """Checks one label on a worker thread."""
+
+    def __init__(self, text: str):
+        super().__init__()
+        self.text = text
+        self.signals = TexCheckSignals()
+
+    def run(self) -> None:
+        self.signals.finished.emit(self.text, check_tex(self.text))